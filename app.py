@@ -1,6 +1,7 @@
+import importlib
 import streamlit as st
-from pages import submit, scores, progress, posts, developer
-from constants import GAMES
+from constants import GAMES, DEFAULT_GROUP_ID
+from utils import groups
 
 st.set_page_config(page_title="LinkedInowe Wariaty", page_icon="🎮")
 st.title("🎮 LinkedInowe Wariaty")
@@ -12,17 +13,39 @@ if "chosen_player" not in st.session_state:
     st.session_state.chosen_player = None
 if "allow_pysiek" not in st.session_state:
     st.session_state.allow_pysiek = True
+if "group_id" not in st.session_state:
+    st.session_state.group_id = DEFAULT_GROUP_ID
 
-# Tabs
-# tab_submit, tab_scores, tab_posts, tab_progress, tab_developer = st.tabs([
-#     "📝 Submit", "📋 Scores", "🗒️ Posts", "📈 Progress", "🛠️ Developer"
-# ])
-tab_submit, tab_scores, tab_posts, tab_progress = st.tabs([
-    "📝 Submit", "📋 Scores", "🗒️ Posts", "📈 Progress"
-])
-
-with tab_submit: submit.show()
-with tab_scores: scores.show()
-with tab_posts: posts.show()
-with tab_progress: progress.show()
-# with tab_developer: developer.show()
+# Optional headless read API, served from this process so it shares the item caches
+if st.secrets.get("api", {}).get("enabled"):
+    from utils import api
+    api.start_from_secrets()
+
+
+def _choose_group():
+    st.session_state.group_id = st.session_state.group_choice
+
+
+# Group (league) selection – every page only reads the chosen group's partitions.
+# The registry is only scanned once someone asks to switch groups.
+if st.sidebar.toggle("Switch group", key="switch_group"):
+    group_names = {g["group_id"]: g["name"] for g in groups.list_groups()}
+    group_ids = list(group_names)
+    st.sidebar.selectbox(
+        "Group", group_ids, format_func=group_names.get, key="group_choice", on_change=_choose_group,
+        index=group_ids.index(st.session_state.group_id) if st.session_state.group_id in group_ids else 0,
+    )
+
+# Pages are imported on first use, so pandas, plotly and boto3 are only
+# loaded once a page that needs them is opened.
+PAGES = {
+    "📝 Submit": "submit",
+    "📋 Scores": "scores",
+    "🗒️ Posts": "posts",
+    "📈 Progress": "progress",
+    "📊 Stats": "stats",
+    # "🛠️ Developer": "developer",
+}
+
+chosen_page = st.radio("Page", list(PAGES), horizontal=True, label_visibility="collapsed", key="chosen_page")
+importlib.import_module(f"pages.{PAGES[chosen_page]}").show()
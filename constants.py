@@ -28,4 +28,16 @@ COLORS = {
     "Maciuś": "#0077ff", # blue
     "Patryk": "#ff0000", # red
     # "Pysiek": "#cc00ff"  # purple
-}
\ No newline at end of file
+}
+
+# Progress time ranges -> days back from today (None = all history)
+TIME_RANGES = {"All": None, "Past Year": 365, "Past Month": 30, "Past Week": 7}
+
+# Group (league) that PLAYERS, GAMES and COLORS above describe
+DEFAULT_GROUP_ID = "wariaty"
+
+# Colors handed out to players of other groups without a configured color
+PALETTE = ["#00ff88", "#0077ff", "#ff0000", "#cc00ff", "#ffaa00", "#00e5ff", "#ff66cc", "#aaff00"]
+
+# Cold `import app` must stay under this (checked by tests/unit/test_startup.py)
+STARTUP_IMPORT_BUDGET_SECONDS = 2.0
@@ -1,15 +1,16 @@
 import streamlit as st
 from datetime import datetime, timedelta
-from utils import data
-from constants import PLAYERS, GAMES
+from utils import data, groups, parser
 
 def show():
     st.header("🛠️ Developer / Test Data")
+    group_id = st.session_state.group_id
+    group = groups.get_group(group_id)
 
     # Player and game selection
     col1, col2 = st.columns([2, 2])
-    test_player = col1.selectbox("Select Player", PLAYERS, key="dev_player")
-    test_game = col2.selectbox("Select Game", GAMES, key="dev_game")
+    test_player = col1.selectbox("Select Player", group["players"], key="dev_player")
+    test_game = col2.selectbox("Select Game", group["games"], key="dev_game")
 
     # Two date pickers
     today = datetime.today().date()
@@ -26,18 +27,61 @@ def show():
     if st.button("Add Test Data"):
         try:
             # Generate entries for the date range
-            data.generate_test_data(
+            batch_id = data.generate_test_data(
                 user=test_player,
                 game=test_game,
                 start_date=start_date,
-                end_date=end_date
+                end_date=end_date,
+                group_id=group_id,
             )
 
             num_entries = (end_date - start_date).days + 1
             st.success(
                 f"Added {num_entries} entries for {test_player} "
-                f"for game: {test_game} from {start_date} to {end_date}"
+                f"for game: {test_game} from {start_date} to {end_date} (batch {batch_id})"
             )
 
         except Exception as e:
             st.error(f"Error generating data for {test_player}: {e}")
+
+    # Purge generated data by batch
+    st.subheader("Purge Test Data")
+    batches = data.list_test_batches(group_id)
+    options = ["All batches"] + list(batches)
+    chosen_batch = st.selectbox(
+        "Batch", options, key="dev_purge_batch",
+        format_func=lambda b: b if b == "All batches" else f"{b} ({batches[b]} rows)",
+    )
+    all_groups = st.checkbox("In every group (parallel scan)", key="dev_purge_all_groups")
+    if st.button("Purge Test Data"):
+        bar = st.progress(0.0, text="Finding test data…")
+
+        def progress(deleted, total):
+            bar.progress(deleted / total, text=f"Deleted {deleted}/{total} rows")
+
+        try:
+            result = data.purge_test_data(
+                batch_id=None if chosen_batch == "All batches" else chosen_batch,
+                group_id=None if all_groups else group_id,
+                progress=progress,
+            )
+            bar.progress(1.0, text="Done")
+            st.success(f"Deleted {result['deleted']} rows from {len(result['batches'])} batches")
+        except Exception as e:
+            st.error(f"Error purging test data: {e}")
+
+    # Cache metrics
+    info = parser.parse_cache_info()
+    st.caption(
+        f"Parse cache: {info['hits']} hits, {info['misses']} misses "
+        f"({info['hit_rate']:.0%} hit rate), {info['size']}/{info['maxsize']} entries"
+    )
+    flights = data.coalescing_info()
+    st.caption(
+        f"Read coalescing: {flights['calls']} reads, {flights['executions']} fetches, "
+        f"{flights['coalesced']} coalesced, {flights['in_flight']} in flight"
+    )
+    status = data.feed_status()
+    if status is not None:
+        state = "healthy" if status["healthy"] else f"failing, reads use delta queries ({status['last_error']})"
+        st.caption(f"Change feed ({status['backend']}): {state}, {status['errors']} failed polls")
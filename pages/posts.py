@@ -1,27 +1,48 @@
 import streamlit as st
 import pandas as pd
-from utils import data
-from constants import PLAYERS
+from utils import data, export, groups
 
 def show():
     st.header("Posts")
-
-    items = data.fetch_all("raw_game_posts")
-
+    group_id = st.session_state.group_id
+    players = groups.get_group(group_id)["players"]
+
+    query = st.text_input("Search posts", key="posts_search",
+                          placeholder="Words, game, number or player, e.g. zip 142 mikuś")
+
+    # Filters (shared by the table and the export)
+    col1, col2 = st.columns([2, 2])
+    selected_players = col1.multiselect("Filter by Player", players, default=players, key="posts_players")
+    date_range = col2.date_input("Filter by Submission Date", value=(), key="posts_date_range")
+    date_from, date_to = export.date_bounds(date_range)
+
+    if query.strip():
+        # Ranked matches from the search index; only those posts are read
+        items = data.search_posts(query, group_id)
+        if not items:
+            st.info("No posts match the search.")
+            return
+    else:
+        # Hot posts, plus archived ones when the range reaches back that far
+        items = data.load_history("raw_game_posts", group_id, since=date_from)
+        if not items:
+            st.info("No posts yet.")
+            return
+
+    items = export.filter_items(items, "raw_game_posts", players=selected_players,
+                                date_from=date_from, date_to=date_to)
     if not items:
-        st.info("No posts yet.")
+        st.info("No posts match the filters.")
         return
 
     # Convert to DataFrame
     df = pd.DataFrame(items)
 
-    # Parse timestamp for sorting
+    # Parse timestamp for sorting (search results keep their ranking)
     if "timestamp" in df.columns:
         df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-        df = df.sort_values(by="timestamp", ascending=False)
-
-    # Filter only allowed players
-    df = df[df["user_id"].isin(PLAYERS)]
+        if not query.strip():
+            df = df.sort_values(by="timestamp", ascending=False)
 
     # Columns to display (no scores)
     df_display = df[["user_id", "raw_post", "timestamp"]].rename(columns={
@@ -31,3 +52,4 @@ def show():
     })
 
     st.dataframe(df_display, use_container_width=True)
+    export.download_controls("raw_game_posts", items, key="posts")
@@ -2,54 +2,101 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime, timedelta
-from constants import PLAYERS, COLORS, GAMES, SCORE_UNITS
-from utils import data
+from constants import SCORE_UNITS, TIME_RANGES
+from utils import data, groups, stats
+from utils.lru import LRUCache
+
+
+# Rough footprint per plotted x or y value and per figure (layout, template),
+# so sizing a cache entry doesn't serialize its figures
+POINT_BYTES = 24
+FIGURE_BYTES = 8 * 1024
+
+
+def _figures_size(entry):
+    """Estimated size of built figures from how many points they plot."""
+    figures, _ = entry
+    points = 0
+    for fig in figures:
+        for trace in fig.data:
+            for axis in ("x", "y"):
+                values = getattr(trace, axis, None)
+                points += 0 if values is None else len(values)
+    return len(figures) * FIGURE_BYTES + points * POINT_BYTES
+
+
+# Built charts per selection and data version, shared by all sessions, so
+# reruns that change nothing relevant skip rebuilding them
+_figure_cache = LRUCache(maxsize=64, max_bytes=32 * 1024 * 1024, sizeof=_figures_size)
 
 def show():
     st.header("Game Progress")
+    _progress_view(st.session_state.group_id)
+
+
+@st.fragment(run_every=data.refresh_interval())
+def _progress_view(group_id):
+    group = groups.get_group(group_id)
+    players = group["players"]
 
     # Reorder columns: Game | Time Range | Players
     col1, col2, col3 = st.columns([2, 2, 2])
-    progress_game = col1.selectbox("Select Game", GAMES, index=0, key="progress_game")
+    progress_game = col1.selectbox("Select Game", group["games"], index=0, key="progress_game")
     time_filter = col2.selectbox(
         "Time Range",
-        ["All", "Past Year", "Past Month", "Past Week"],
+        list(TIME_RANGES),
         index=0,
         key="progress_time_filter"
     )
-    progress_players = col3.multiselect("Select Players", PLAYERS, default=PLAYERS, key="progress_players")
-
-    # fetch from DynamoDB
-    items = data.fetch_all("game_scores")
+    progress_players = col3.multiselect("Select Players", players, default=players, key="progress_players")
+
+    # Cached items plus anything saved since the last read; "All" also
+    # merges archived scores
+    days = TIME_RANGES[time_filter]
+    since = None if days is None else (datetime.now() - timedelta(days=days)).date().isoformat()
+    # Read the version first: a change landing in between then only costs a rebuild
+    version = data.data_version("game_scores", group_id)
+    items = data.load_history("game_scores", group_id, since=since)
     if not items:
         st.info("No scores yet.")
         return
 
+    # Relative ranges move with the date, so it is part of the key
+    key = (
+        group_id, progress_game, tuple(sorted(progress_players)), time_filter,
+        datetime.now().date() if days is not None else None,
+        tuple(sorted(group["colors"].items())),
+        version,
+    )
+    entry = _figure_cache.get(key)
+    if entry is None:
+        entry = _build_figures(items, progress_game, progress_players, days, group["colors"])
+        _figure_cache.put(key, entry)
+
+    figures, message = entry
+    if message:
+        st.info(message)
+    for fig in figures:
+        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+
+
+def _build_figures(items, progress_game, progress_players, days, colors):
+    """One line chart per score of the game; returns (figures, message to show instead)."""
     df = pd.DataFrame(items)
     df = df[df["game_name"] == progress_game]
     df = df[df["user_id"].isin(progress_players)]
     if df.empty:
-        st.info(f"No data for {progress_game} for selected players.")
-        return
+        return [], f"No data for {progress_game} for selected players."
 
     # Ensure game_date is datetime
-    df["game_date"] = pd.to_datetime(df["game_date"], format="%d-%m-%Y")
+    df["game_date"] = stats.parse_game_dates(df["game_date"])
 
     # Apply time filter
-    now = datetime.now()
-    if time_filter == "Past Year":
-        cutoff = now - timedelta(days=365)
-        df = df[df["game_date"] >= cutoff]
-    elif time_filter == "Past Month":
-        cutoff = now - timedelta(days=30)
-        df = df[df["game_date"] >= cutoff]
-    elif time_filter == "Past Week":
-        cutoff = now - timedelta(days=7)
-        df = df[df["game_date"] >= cutoff]
+    if days is not None:
+        df = df[df["game_date"] >= datetime.now() - timedelta(days=days)]
 
     if df.empty:
-        st.info("No data for the selected time range.")
-        return
+        return [], "No data for the selected time range."
 
     # Determine max number of scores
     max_scores = df["scores"].apply(lambda x: len(x) if isinstance(x, list) else 0).max()
@@ -58,6 +105,7 @@ def show():
     units_list = SCORE_UNITS.get(progress_game, [])
 
     # Plot each score as a separate graph
+    figures = []
     for idx in range(max_scores):
         y_values = df["scores"].apply(lambda s: s[idx] if isinstance(s, list) and idx < len(s) else None)
         if y_values.isnull().all():
@@ -77,7 +125,7 @@ def show():
             color="Player",
             markers=True,
             line_shape="spline",
-            color_discrete_map=COLORS,
+            color_discrete_map=colors,
             template="plotly_dark",
             labels={"game_date": "Date", "score_y": unit_label, "Player": "Player"},
             title=f"{unit_label} vs Date"  # <-- clean title
@@ -103,4 +151,5 @@ def show():
             )
         )
 
-        st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
+        figures.append(fig)
+    return figures, None
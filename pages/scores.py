@@ -1,24 +1,42 @@
 import streamlit as st
 import pandas as pd
-from utils import data
-from constants import PLAYERS, GAMES
+from utils import data, export, groups
 
 def show():
     st.header("All Scores")
+    _scores_view(st.session_state.group_id)
 
-    # Always fetch fresh data from DynamoDB
-    items = data.fetch_all("game_scores")
+
+@st.fragment(run_every=data.refresh_interval())
+def _scores_view(group_id):
+    group = groups.get_group(group_id)
+    players = group["players"]
+
+    # Filters
+    col1, col2, col3 = st.columns([2, 2, 2])
+    selected_game = col1.selectbox("Filter by Game", ["All"] + group["games"])
+    selected_players = col2.multiselect("Filter by Player", players, default=players)
+    date_range = col3.date_input("Filter by Game Date", value=(), key="scores_date_range")
+    date_from, date_to = export.date_bounds(date_range)
+
+    # Cached items plus anything saved since the last read, and archived
+    # scores when the date range reaches back that far
+    items = data.load_history("game_scores", group_id, since=date_from)
     if not items:
         st.info("No scores yet.")
         return
 
-    df_all = pd.DataFrame(items)
-    if df_all.empty:
-        st.info("No scores yet.")
+    # Same filters for the table and the export
+    items = export.filter_items(
+        items, "game_scores",
+        game=None if selected_game == "All" else selected_game,
+        players=selected_players, date_from=date_from, date_to=date_to,
+    )
+    if not items:
+        st.info("No scores match the filters.")
         return
 
-    # Filter only allowed players
-    df_all = df_all[df_all["user_id"].isin(PLAYERS)]
+    df_all = pd.DataFrame(items)
 
     # Convert scores + units to a display string
     def format_scores_units(row):
@@ -39,19 +57,8 @@ def show():
         }
     )
 
-    # Filters
-    col1, col2 = st.columns([2, 2])
-    selected_game = col1.selectbox("Filter by Game", ["All"] + GAMES)
-    selected_players = col2.multiselect("Filter by Player", PLAYERS, default=PLAYERS)
-
-    if selected_game != "All":
-        df_all = df_all[df_all["Game"] == selected_game]
-    if selected_players:
-        df_all = df_all[df_all["Player"].isin(selected_players)]
-    else:
-        df_all = pd.DataFrame(columns=df_all.columns)
-
     # Sort nicely
     df_all = df_all.sort_values(by=["Game", "Game Number", "Player"])
 
     st.dataframe(df_all, use_container_width=True)
+    export.download_controls("game_scores", items, key="scores")
@@ -0,0 +1,66 @@
+import streamlit as st
+import plotly.graph_objects as go
+from constants import SCORE_UNITS
+from utils import groups, stats
+
+def show():
+    st.header("📊 Stats")
+    group_id = st.session_state.group_id
+    group = groups.get_group(group_id)
+    players = group["players"]
+
+    col1, col2, col3 = st.columns([2, 2, 2])
+    stats_game = col1.selectbox("Select Game", group["games"], index=0, key="stats_game")
+    stats_metric = col2.selectbox("Metric", SCORE_UNITS.get(stats_game, ["Score"]), key="stats_metric")
+    stats_players = col3.multiselect("Select Players", players, default=players, key="stats_players")
+
+    # Cached per data version; only new scores are folded in
+    df = stats.group_stats(group_id)
+    df = df[
+        (df["game_name"] == stats_game)
+        & (df["metric"] == stats_metric)
+        & (df["user_id"].isin(stats_players))
+    ]
+    if df.empty:
+        st.info(f"No {stats_metric} data for {stats_game} for selected players.")
+        return
+
+    better = "lower" if stats_metric in stats.LOWER_IS_BETTER else "higher"
+    st.caption(f"{stats.DEFAULT_WINDOW_DAYS}-day rolling windows; {better} is better.")
+
+    # Latest values per player
+    summary = stats.latest(df)[["user_id", "value", "mean", "median", "p25", "p75", "best"]].rename(columns={
+        "user_id": "Player",
+        "value": "Last",
+        "mean": "Mean",
+        "median": "Median",
+        "p25": "P25",
+        "p75": "P75",
+        "best": "Personal Best",
+    })
+    st.dataframe(summary.round(1), use_container_width=True, hide_index=True)
+
+    # Rolling mean with a P25–P75 band per player
+    fig = go.Figure()
+    for player, player_df in df.groupby("user_id", sort=False):
+        color = group["colors"].get(player)
+        fig.add_trace(go.Scatter(
+            x=list(player_df["game_date"]) + list(player_df["game_date"][::-1]),
+            y=list(player_df["p75"]) + list(player_df["p25"][::-1]),
+            fill="toself", fillcolor=color, opacity=0.15, line=dict(width=0),
+            hoverinfo="skip", showlegend=False, legendgroup=player,
+        ))
+        fig.add_trace(go.Scatter(
+            x=player_df["game_date"], y=player_df["mean"], name=player, legendgroup=player,
+            mode="lines", line=dict(color=color, width=3, shape="spline"),
+            hovertemplate="Date: %{x|%d-%m-%Y}<br>" f"Mean {stats_metric}: %{{y:.1f}}<extra>{player}</extra>",
+        ))
+
+    fig.update_layout(
+        template="plotly_dark",
+        title=f"{stats.DEFAULT_WINDOW_DAYS}-day mean {stats_metric}",
+        margin=dict(l=40, r=40, t=40, b=40),
+        legend_title="Player",
+    )
+    fig.update_xaxes(tickformat="%d-%m-%Y", tickangle=45)
+    st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
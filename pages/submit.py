@@ -1,11 +1,34 @@
 import streamlit as st
-from utils import data, parser
-from constants import PLAYERS, GAMES, SCORE_UNITS
+from utils import data, groups, parser
+from constants import GAMES, SCORE_UNITS
 from datetime import datetime
 
+
+@st.fragment(run_every="2s")
+def _show_write_status():
+    """Show the status of the last submitted write while it is in the background queue."""
+    last_write = st.session_state.get("last_write")
+    if last_write is None:
+        return
+    table_name, item = last_write
+    status = data.write_status(table_name, item)
+    if status in ("queued", "retrying"):
+        st.caption(f"⏳ Saving in background ({status})…")
+    elif status == "failed":
+        st.error(
+            f"Saving failed ({data.write_error(table_name, item)}). The write is kept locally: "
+            "retry it now, or it is retried when the app restarts."
+        )
+        if st.button("Retry save", key="retry_write"):
+            data.retry_failed_writes()
+            st.rerun(scope="fragment")
+
+
 def show():
     st.header("📝 Submit a LinkedIn Game Post")
-    
+    group_id = st.session_state.group_id
+    group = groups.get_group(group_id)
+
     # Raw post input
     raw_post = st.text_area(
         "Paste LinkedIn post here", 
@@ -14,7 +37,7 @@ def show():
     )
 
     # Player selection
-    player = st.selectbox("Select Player", PLAYERS, index=0, key="submit_player")
+    player = st.selectbox("Select Player", group["players"], index=0, key="submit_player")
 
     # Initialize parsed fields
     parsed = {}
@@ -24,7 +47,8 @@ def show():
     # Try parsing automatically
     if raw_post.strip():
         try:
-            parsed = parser.parse_post(raw_post)
+            # Cached: this runs on every rerun, while the post text rarely changes
+            parsed = parser.parse_post_cached(raw_post)
             scores = parsed.get("scores", [])
             parsed_units = parsed.get("units", [])
             game_number = parsed.get("game_number")
@@ -48,8 +72,8 @@ def show():
                 st.session_state.previous_game = parsed_game
 
             # Determine default index
-            default_index = GAMES.index(parsed_game) if parsed_game in GAMES else 0
-            game = st.selectbox("Select Game", GAMES, index=default_index, key="advanced_game_select")
+            default_index = group["games"].index(parsed_game) if parsed_game in group["games"] else 0
+            game = st.selectbox("Select Game", group["games"], index=default_index, key="advanced_game_select")
 
             # Determine units: update if game changed OR first render
             if st.session_state.previous_game != game:
@@ -80,7 +104,7 @@ def show():
                 key="submit_game_number"
             )
             game_date = st.date_input(
-                "Game Date (dd-mm-yyyy)", 
+                "Game Date", 
                 value=game_date or datetime.today(),
                 key="submit_game_date"
             )
@@ -93,10 +117,15 @@ def show():
                 return
             units = [u.strip() for u in units_input.split(",") if u.strip()]
 
+    # Only background writes have a status worth polling
+    if data.write_queue_enabled():
+        _show_write_status()
+
     # Submit button
     if st.button("Submit"):
         if not show_advanced or not advanced_modify:
-            data.save_post(player, raw_post)
+            post_item = data.save_post(player, raw_post, group_id=group_id, parsed=parsed or None)
+            st.session_state.last_write = ("raw_game_posts", post_item)
             st.success(f"Post submitted for {player} ({parsed_game or 'Unknown'}).")
             return
 
@@ -110,12 +139,14 @@ def show():
             st.error("Number of scores and units must match.")
             return
 
-        data.save_score(
+        score_item = data.save_score(
             user_id=player,
             game_name=game,
             game_number=game_number,
             scores=scores,
             units=units,
-            game_date=game_date.strftime("%d-%m-%Y") if hasattr(game_date, "strftime") else str(game_date)
+            game_date=game_date.isoformat() if hasattr(game_date, "isoformat") else str(game_date),
+            group_id=group_id,
         )
+        st.session_state.last_write = ("game_scores", score_item)
         st.success(f"Score submitted for {player} ({game}).")
@@ -0,0 +1,60 @@
+"""
+Move posts and scores older than the retention age to the local Parquet archive.
+
+Usage:
+    python scripts/archive.py raw_game_posts [--max-age-days 180] [--ttl-days 7]
+        [--group wariaty ...] [--dry-run]
+
+Defaults come from the [archive] section of .streamlit/secrets.toml.
+Archived items are deleted from DynamoDB, or with --ttl-days stamped with
+`expires_at` so DynamoDB TTL removes them after that grace period.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+from utils import archive, data  # noqa: E402
+
+
+def main():
+    cfg = st.secrets.get("archive", {})
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("table", choices=["game_scores", "raw_game_posts"])
+    arg_parser.add_argument("--max-age-days", type=int, default=cfg.get("max_age_days"),
+                            required=cfg.get("max_age_days") is None)
+    arg_parser.add_argument("--ttl-days", type=int, default=cfg.get("ttl_days"),
+                            help="expire archived items with DynamoDB TTL instead of deleting them")
+    arg_parser.add_argument("--directory", default=cfg.get("directory", archive.ARCHIVE_DIR))
+    arg_parser.add_argument("--group", action="append", dest="groups", help="only these groups")
+    arg_parser.add_argument("--dry-run", action="store_true", help="count cold items without moving them")
+    args = arg_parser.parse_args()
+
+    AWS_CFG = st.secrets.get("aws", {})
+    if args.ttl_days is not None and not args.dry_run:
+        archive.enable_ttl(AWS_CFG, args.table)
+
+    def progress(group_id, player, archived):
+        if archived:
+            print(f"{group_id}/{player}: {archived} items", file=sys.stderr)
+
+    result = archive.run(
+        AWS_CFG, args.table, args.max_age_days, directory=args.directory, ttl_days=args.ttl_days,
+        group_ids=args.groups, dry_run=args.dry_run, progress=progress,
+    )
+    if not args.dry_run:
+        # This process caches nothing itself: forget() drops the snapshots on this
+        # machine, so no restart reloads the items as hot, and publishes REMOVE
+        # records to a local change feed, from which running app processes evict
+        # them. With DynamoDB Streams the deletes reach the apps on their own.
+        for group_id, items in result["items"].items():
+            data.forget(args.table, group_id, items)
+
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {result['archived']} items from {args.table} into {len(result['paths'])} parts")
+
+
+if __name__ == "__main__":
+    main()
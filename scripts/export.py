@@ -0,0 +1,54 @@
+"""
+Export filtered scores or posts of a group to CSV, JSONL or Parquet.
+
+Usage:
+    python scripts/export.py game_scores scores.parquet [--group wariaty] [--game Zip]
+        [--player Mikuś ...] [--from 2025-01-01] [--to 2025-12-31]
+
+Items are streamed page by page from DynamoDB key queries, so memory use
+stays flat however large the table is. The format is taken from the
+output file extension unless --format is given.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+from constants import DEFAULT_GROUP_ID  # noqa: E402
+from utils import export  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("table", choices=list(export.COLUMNS))
+    arg_parser.add_argument("output", help="output file, or - for stdout")
+    arg_parser.add_argument("--format", choices=list(export.FORMATS))
+    arg_parser.add_argument("--group", default=DEFAULT_GROUP_ID)
+    arg_parser.add_argument("--game")
+    arg_parser.add_argument("--player", action="append", dest="players")
+    arg_parser.add_argument("--from", dest="date_from", help="YYYY-MM-DD")
+    arg_parser.add_argument("--to", dest="date_to", help="YYYY-MM-DD")
+    arg_parser.add_argument("--page-size", type=int, default=500)
+    args = arg_parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.output)[1].lstrip(".")
+    if fmt not in export.FORMATS:
+        arg_parser.error(f"cannot tell the format from '{args.output}', use --format")
+
+    pages = export.iter_pages(
+        st.secrets.get("aws", {}), args.table, group_id=args.group, game=args.game,
+        players=args.players, date_from=args.date_from, date_to=args.date_to,
+        page_size=args.page_size,
+    )
+    if args.output == "-":
+        rows = export.write(pages, args.table, fmt, sys.stdout.buffer)
+    else:
+        with open(args.output, "wb") as out:
+            rows = export.write(pages, args.table, fmt, out)
+    print(f"Exported {rows} rows from {args.table}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Upgrade stored items to the latest schema version.
+
+Usage:
+    python scripts/migrate.py game_scores [--dry-run] [--segments 4] [--page-size 500]
+    python scripts/migrate.py game_scores --copy-to game_scores_v2 [--create] [--source game_scores]
+
+With --copy-to, a table created before groups (keyed by user_id) is copied
+into a new table keyed by pk instead; see "Moving to the pk key" in the
+README. Uses the AWS credentials from .streamlit/secrets.toml. Progress is
+checkpointed under .migrations/, so re-running an interrupted migration
+resumes it.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import streamlit as st  # noqa: E402
+from utils import migrations  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("table", choices=["game_scores", "raw_game_posts"])
+    arg_parser.add_argument("--dry-run", action="store_true", help="count changes without writing")
+    arg_parser.add_argument("--segments", type=int, default=4, help="parallel scan segments")
+    arg_parser.add_argument("--page-size", type=int, default=500)
+    arg_parser.add_argument("--checkpoint", help="checkpoint file (default .migrations/<table>.json)")
+    arg_parser.add_argument("--copy-to", metavar="TARGET", help="copy into TARGET, keyed by pk")
+    arg_parser.add_argument("--source", help="table to copy from (default: the table name)")
+    arg_parser.add_argument("--create", action="store_true", help="create TARGET first")
+    args = arg_parser.parse_args()
+    AWS_CFG = st.secrets.get("aws", {})
+
+    def progress(segment, scanned, changed):
+        print(f"segment {segment}: scanned {scanned}, {'would change' if args.dry_run else 'changed'} {changed}")
+
+    if args.copy_to:
+        if args.create and not args.dry_run:
+            migrations.create_table(AWS_CFG, args.copy_to)
+        result = migrations.rekey(
+            AWS_CFG, args.table, args.source or args.table, args.copy_to,
+            dry_run=args.dry_run, segments=args.segments, page_size=args.page_size,
+            checkpoint_path=args.checkpoint, progress=progress,
+        )
+        verb = "would copy" if args.dry_run else "copied"
+        print(f"{args.table}: scanned {result['scanned']}, {verb} {result['copied']} into {args.copy_to}")
+        if not args.dry_run:
+            print(f'Now add  [tables] {args.table} = "{args.copy_to}"  to .streamlit/secrets.toml')
+        return
+
+    result = migrations.migrate(
+        AWS_CFG, args.table,
+        dry_run=args.dry_run, segments=args.segments, page_size=args.page_size,
+        checkpoint_path=args.checkpoint, progress=progress,
+    )
+    verb = "would change" if args.dry_run else "changed"
+    print(f"{args.table}: scanned {result['scanned']}, {verb} {result['changed']} "
+          f"(schema version {result['target_version']})")
+
+
+if __name__ == "__main__":
+    main()
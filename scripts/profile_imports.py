@@ -0,0 +1,48 @@
+"""
+Profile cold import time of the Streamlit app.
+
+Usage:
+    python scripts/profile_imports.py [module] [--top N]
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+prints the slowest imports by cumulative time.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile(module: str = "app"):
+    """Return [(cumulative_us, self_us, name)] for a cold import of `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("module", nargs="?", default="app")
+    arg_parser.add_argument("--top", type=int, default=25)
+    args = arg_parser.parse_args()
+
+    rows = profile(args.module)
+    total = max((r[0] for r in rows), default=0)
+    print(f"Cold import of '{args.module}': {total / 1e6:.3f}s")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1e3:>10.1f}ms {self_us / 1e3:>8.1f}ms {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Run the read API on its own, without the Streamlit app.
+
+Usage:
+    python scripts/serve_api.py [--host 127.0.0.1] [--port 8502]
+
+Prefer `[api] enabled = true` in secrets when the app is running: the API
+then lives in the app process and shares its item caches.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http.server import ThreadingHTTPServer  # noqa: E402
+from utils import api  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8502)
+    args = arg_parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), api.Handler)
+    server.daemon_threads = True
+    print(f"Serving read API on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import json
+import urllib.request
+import pytest
+from urllib.error import HTTPError
+from unittest.mock import patch
+from utils import api, groups, stats
+from constants import DEFAULT_GROUP_ID
+
+ITEMS = [
+    {"pk": f"{DEFAULT_GROUP_ID}#{user}", "group_id": DEFAULT_GROUP_ID, "user_id": user, "game_name": "Queens",
+     "game_number": day, "scores": [seconds], "units": ["seconds"],
+     "game_date": f"2025-10-{day:02d}", "timestamp": f"2025-10-{day:02d}T10:00:00"}
+    for user, day, seconds in [("Mikuś", 1, 120), ("Maciuś", 1, 90), ("Mikuś", 2, 100), ("Maciuś", 2, 95)]
+]
+
+
+def _get_group(group_id):
+    if group_id != DEFAULT_GROUP_ID:
+        raise ValueError(f"Unknown group '{group_id}'")
+    return groups.default_group()
+
+
+@pytest.fixture
+def backend():
+    """Serve ITEMS from a stand-in cache whose version the test controls."""
+    versions = {"game_scores": 1}
+    with patch("utils.api.groups.get_group", side_effect=_get_group), \
+         patch("utils.api.data.load_history", return_value=ITEMS) as load_history, \
+         patch("utils.api.data.data_version", side_effect=lambda table, group: versions.get(table, 0)), \
+         patch("utils.stats.data.load_history", return_value=ITEMS), \
+         patch("utils.stats.data.data_version", side_effect=lambda table, group: versions.get(table, 0)):
+        stats._engine._state.clear()
+        yield versions, load_history
+
+
+def test_scores_are_filtered(backend):
+    status, headers, body = api.handle(f"/groups/{DEFAULT_GROUP_ID}/scores?player=Mikuś&from=2025-10-02")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    rows = json.loads(body)
+    assert [(r["user_id"], r["scores"]) for r in rows] == [("Mikuś", [100])]
+
+
+def test_etag_revalidation_tracks_data_version(backend):
+    versions, _ = backend
+    path = f"/groups/{DEFAULT_GROUP_ID}/scores?game=Queens"
+    _, headers, _ = api.handle(path)
+    tag = headers["ETag"]
+
+    status, headers, body = api.handle(path, if_none_match=tag)
+    assert (status, body, headers["ETag"]) == (304, b"", tag)
+
+    versions["game_scores"] += 1
+    status, headers, _ = api.handle(path, if_none_match=tag)
+    assert status == 200 and headers["ETag"] != tag
+
+
+def test_etag_is_read_before_the_items(backend):
+    versions, _ = backend
+
+    def load_changed(*args, **kwargs):
+        versions["game_scores"] += 1   # a change lands while the items are loaded
+        return ITEMS
+
+    api.data.load_history.side_effect = load_changed
+    path = f"/groups/{DEFAULT_GROUP_ID}/scores"
+    tag = api.handle(path)[1]["ETag"]
+    assert api.handle(path, if_none_match=tag)[0] == 200
+
+    api.data.load_history.side_effect = None
+    tag = api.handle(path)[1]["ETag"]
+    assert api.handle(path, if_none_match=tag)[0] == 304
+
+
+def test_etag_depends_on_query_not_parameter_order(backend):
+    a = api.handle(f"/groups/{DEFAULT_GROUP_ID}/scores?game=Queens&player=Mikuś")[1]["ETag"]
+    b = api.handle(f"/groups/{DEFAULT_GROUP_ID}/scores?player=Mikuś&game=Queens")[1]["ETag"]
+    c = api.handle(f"/groups/{DEFAULT_GROUP_ID}/scores?player=Maciuś&game=Queens")[1]["ETag"]
+    assert a == b != c
+
+
+def test_etag_of_days_window_changes_with_the_date(backend):
+    from datetime import date
+
+    path = f"/groups/{DEFAULT_GROUP_ID}/progress?game=Queens&days=7"
+    with patch("utils.api.date") as mock_date:
+        mock_date.today.return_value = date(2025, 10, 2)
+        today = api.handle(path)[1]["ETag"]
+        assert api.handle(path)[1]["ETag"] == today
+        mock_date.today.return_value = date(2025, 10, 3)
+        assert api.handle(path)[1]["ETag"] != today
+
+
+def test_progress_series(backend):
+    status, _, body = api.handle(f"/groups/{DEFAULT_GROUP_ID}/progress?game=Queens")
+    assert status == 200
+    assert json.loads(body)["seconds"]["Mikuś"] == [["2025-10-01", 120.0], ["2025-10-02", 100.0]]
+
+
+def test_leaderboard_ranks_lower_seconds_first(backend):
+    status, _, body = api.handle(f"/groups/{DEFAULT_GROUP_ID}/leaderboard?game=Queens")
+    board = json.loads(body)["Queens"]["seconds"]
+    assert [(r["rank"], r["user_id"]) for r in board] == [(1, "Maciuś"), (2, "Mikuś")]
+
+
+@pytest.mark.parametrize("path,status", [
+    ("/groups/nope/scores", 404),
+    (f"/groups/{DEFAULT_GROUP_ID}/unknown", 404),
+    (f"/groups/{DEFAULT_GROUP_ID}/progress", 400),
+    (f"/groups/{DEFAULT_GROUP_ID}/scores?player=Nobody", 400),
+    (f"/groups/{DEFAULT_GROUP_ID}/posts?limit=many", 400),
+])
+def test_errors(backend, path, status):
+    assert api.handle(path)[0] == status
+
+
+def test_backend_failure_is_a_json_500(backend):
+    api.data.load_history.side_effect = RuntimeError("Querying 'game_scores' by pk failed")
+    server = api.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/groups/{DEFAULT_GROUP_ID}/scores"
+        with pytest.raises(HTTPError) as e:
+            urllib.request.urlopen(url)
+        assert e.value.code == 500
+        assert "by pk failed" in json.loads(e.value.read())["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_server_answers_304(backend):
+    server = api.serve(port=0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/groups/{DEFAULT_GROUP_ID}/scores"
+        with urllib.request.urlopen(url) as response:
+            tag = response.headers["ETag"]
+            assert len(json.loads(response.read())) == len(ITEMS)
+
+        request = urllib.request.Request(url, headers={"If-None-Match": tag})
+        with pytest.raises(HTTPError) as e:
+            urllib.request.urlopen(request)
+        assert e.value.code == 304
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,108 @@
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from utils import archive, aws, data, groups
+from constants import DEFAULT_GROUP_ID
+
+
+def _post(user, days_ago, **extra):
+    ts = (datetime.now(timezone.utc) - timedelta(days=days_ago)).isoformat()
+    return {"pk": groups.partition_key(DEFAULT_GROUP_ID, user), "group_id": DEFAULT_GROUP_ID,
+            "user_id": user, "raw_post": f"post {days_ago}", "timestamp": ts, **extra}
+
+
+@pytest.fixture
+def table():
+    with patch("streamlit.warning"):
+        mock_table = aws.get_ddb_table({}, "raw_game_posts")
+    for item in [_post("Mikuś", 400), _post("Mikuś", 200), _post("Maciuś", 300), _post("Maciuś", 5)]:
+        mock_table.put_item(Item=item)
+    with patch("utils.archive.aws.get_ddb_table", return_value=mock_table), \
+         patch("utils.archive.groups.list_groups", return_value=[groups.default_group()]):
+        yield mock_table
+
+
+def test_run_moves_cold_items_to_month_partitions(table, tmp_path):
+    result = archive.run({}, "raw_game_posts", max_age_days=180, directory=str(tmp_path))
+
+    assert result["archived"] == 3
+    assert [i["raw_post"] for i in table.data] == ["post 5"]
+    paths = archive.parts(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID)
+    assert len(paths) == 3 and all("month=" in p and p.endswith(".parquet") for p in paths)
+    archived = archive.load(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID)
+    assert sorted(i["raw_post"] for i in archived) == ["post 200", "post 300", "post 400"]
+
+
+def test_dry_run_changes_nothing(table, tmp_path):
+    result = archive.run({}, "raw_game_posts", max_age_days=180, directory=str(tmp_path), dry_run=True)
+    assert result["archived"] == 3
+    assert len(table.data) == 4
+    assert archive.parts(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID) == []
+
+
+def test_ttl_mode_stamps_items_and_skips_them_next_time(table, tmp_path):
+    archive.run({}, "raw_game_posts", max_age_days=180, directory=str(tmp_path), ttl_days=7)
+
+    stamped = [i for i in table.data if archive.TTL_ATTR in i]
+    assert len(table.data) == 4 and len(stamped) == 3
+    assert archive.run({}, "raw_game_posts", max_age_days=180, directory=str(tmp_path), ttl_days=7)["archived"] == 0
+
+
+def test_load_prunes_month_partitions(tmp_path):
+    items = [dict(_post("Mikuś", 0), timestamp=f"2025-{m:02d}-10T10:00:00") for m in (1, 2, 3)]
+    archive.write_partitions(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID, items)
+
+    since_feb = archive.load(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID, since="2025-02-15")
+    assert sorted(i["timestamp"][:7] for i in since_feb) == ["2025-02", "2025-03"]
+
+
+def test_parts_cache_is_bounded_by_bytes(tmp_path, monkeypatch):
+    from utils.lru import LRUCache
+
+    items = [dict(_post("Mikuś", 0), timestamp=f"2025-{m:02d}-10T10:00:00") for m in (1, 2, 3)]
+    archive.write_partitions(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID, items)
+    one_part = archive._items_size(items[:1])
+    cache = LRUCache(max_bytes=2 * one_part, sizeof=archive._items_size)
+    monkeypatch.setattr(archive, "_parts_cache", cache)
+
+    assert len(archive.load(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID)) == 3
+    assert len(cache) == 2 and cache.bytes <= 2 * one_part
+    archive.load(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID, since="2025-03")
+    assert cache.hits == 1
+
+
+def test_load_history_merges_archive_for_long_ranges(tmp_path, monkeypatch):
+    hot = [_post("Mikuś", 1)]
+    cold = [_post("Mikuś", 300), _post("Maciuś", 250)]
+    archive.write_partitions(str(tmp_path), "raw_game_posts", DEFAULT_GROUP_ID, cold + hot)  # hot copy too
+    monkeypatch.setattr(data, "_get_archive_cfg", lambda: (str(tmp_path), 180))
+    monkeypatch.setattr(data, "_archive_seen", {})
+
+    with patch("utils.data.load_items", return_value=hot), \
+         patch("utils.data.archive.load", wraps=archive.load) as load:
+        recent = (datetime.now() - timedelta(days=30)).date().isoformat()
+        assert data.load_history("raw_game_posts", since=recent) == hot
+        load.assert_not_called()
+
+        version = data.data_version("raw_game_posts")
+        everything = data.load_history("raw_game_posts")
+        assert sorted(i["raw_post"] for i in everything) == ["post 1", "post 250", "post 300"]
+        assert data.data_version("raw_game_posts") == version + 1
+
+        data.load_history("raw_game_posts")
+        assert data.data_version("raw_game_posts") == version + 1  # archive unchanged
+
+
+def test_forget_evicts_cache_and_snapshots(tmp_path, monkeypatch):
+    from utils import snapshot
+
+    old, new = _post("Mikuś", 300), _post("Mikuś", 1)
+    snapshot.write_snapshot(str(tmp_path), f"raw_game_posts.{DEFAULT_GROUP_ID}", [old, new], new["timestamp"])
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: (str(tmp_path), 600))
+    monkeypatch.setattr(data, "_items_cache", {
+        ("raw_game_posts", DEFAULT_GROUP_ID): data._new_entry([old, new], new["timestamp"])})
+
+    data.forget("raw_game_posts", DEFAULT_GROUP_ID, [old])
+
+    assert list(data._items_cache[("raw_game_posts", DEFAULT_GROUP_ID)]["items"].values()) == [new]
+    assert snapshot.load_latest(str(tmp_path), f"raw_game_posts.{DEFAULT_GROUP_ID}") == (None, None)
@@ -86,6 +86,25 @@ def test_mock_table_operations():
     result = table.scan()
     assert len(result['Items']) == 0
 
+# ----------------------------
+# Test MockTable query and filtered scan
+# ----------------------------
+def test_mock_table_query():
+    from boto3.dynamodb.conditions import Key, Attr
+    table = aws.get_ddb_table({}, 'test_table')
+    table.put_item(Item={'user_id': '1', 'timestamp': '2023-01-02', 'game_name': 'Zip'})
+    table.put_item(Item={'user_id': '1', 'timestamp': '2023-01-01', 'game_name': 'Queens'})
+    table.put_item(Item={'user_id': '2', 'timestamp': '2023-01-03', 'game_name': 'Zip'})
+
+    result = table.query(KeyConditionExpression=Key('user_id').eq('1'))
+    assert [i['timestamp'] for i in result['Items']] == ['2023-01-01', '2023-01-02']
+
+    result = table.query(KeyConditionExpression=Key('user_id').eq('1') & Key('timestamp').gt('2023-01-01'))
+    assert [i['timestamp'] for i in result['Items']] == ['2023-01-02']
+
+    result = table.scan(FilterExpression=Attr('game_name').eq('Zip'))
+    assert len(result['Items']) == 2
+
 # ----------------------------
 # Run tests directly
 # ----------------------------
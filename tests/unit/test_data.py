@@ -1,8 +1,15 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import date, timedelta
-from utils import data
-from constants import PLAYERS, GAMES
+from utils import aws, data, groups, snapshot
+from constants import PLAYERS, GAMES, DEFAULT_GROUP_ID
+
+
+@pytest.fixture(autouse=True)
+def default_group_registry():
+    """Serve the default group without touching the (patched) groups table."""
+    with patch("utils.data.groups.get_group", side_effect=lambda group_id=DEFAULT_GROUP_ID: groups.default_group()):
+        yield
 
 
 @patch("utils.data.aws.get_ddb_table")
@@ -36,11 +43,12 @@ def test_save_score(mock_get_table):
     )
 
     assert result["user_id"] == "Mikuś"
+    assert result["pk"] == f"{DEFAULT_GROUP_ID}#Mikuś"
     assert result["game_name"] == game_name
     assert result["game_number"] == game_number
     assert result["scores"] == scores
     assert result["units"] == units
-    assert result["game_date"] == "03-10-2025"
+    assert result["game_date"] == "2025-10-03"
 
     mock_get_table.assert_called_once_with(data._get_cfg(), "game_scores")
     mock_table.put_item.assert_called_once()
@@ -119,12 +127,165 @@ def test_generate_test_data(mock_get_table):
         start_date=start,
         end_date=end,
     )
-    assert result is True
+    assert result  # the batch id
     assert mock_table.put_item.call_count == 3
 
     first_item = mock_table.put_item.call_args_list[0][1]["Item"]
+    assert first_item[data.TEST_BATCH_ATTR] == result
     assert first_item["user_id"] == "Mikuś"
     assert first_item["game_name"] == "Pinpoint"
-    assert first_item["game_date"] == "01-10-2025"
+    assert first_item["game_date"] == "2025-10-01"
     assert "scores" in first_item
     assert "units" in first_item
+
+
+@patch("utils.data._get_snapshot_cfg")
+@patch("utils.data.aws.get_ddb_table")
+def test_load_items_starts_from_snapshot_and_fetches_delta(mock_get_table, mock_snapshot_cfg, tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_items_cache", {})
+    mock_snapshot_cfg.return_value = (str(tmp_path), 3600)
+    old = {"pk": f"{DEFAULT_GROUP_ID}#Mikuś", "user_id": "Mikuś", "timestamp": "2025-10-01T10:00:00"}
+    snapshot.write_snapshot(str(tmp_path), f"game_scores.{DEFAULT_GROUP_ID}", [old], watermark=old["timestamp"])
+
+    new = {"pk": f"{DEFAULT_GROUP_ID}#Maciuś", "user_id": "Maciuś", "timestamp": "2025-10-02T10:00:00"}
+    other_group = {"pk": "other#Maciuś", "user_id": "Maciuś", "timestamp": "2025-10-02T11:00:00"}
+    mock_table = MagicMock()
+    mock_table.query.side_effect = lambda **kw: {
+        "Items": [i for i in [old, new, other_group] if aws._matches(kw["KeyConditionExpression"], i)]
+    }
+    mock_get_table.return_value = mock_table
+
+    items = data.load_items("game_scores")
+
+    assert sorted(i["user_id"] for i in items) == ["Maciuś", "Mikuś"]
+    mock_table.scan.assert_not_called()
+    assert mock_table.query.call_count == len(PLAYERS)
+    assert data._items_cache[("game_scores", DEFAULT_GROUP_ID)]["watermark"] == new["timestamp"]
+
+
+@patch("utils.data._get_snapshot_cfg")
+@patch("utils.data.aws.get_ddb_table")
+def test_load_items_cold_start_queries_group_and_snapshots(mock_get_table, mock_snapshot_cfg, tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_items_cache", {})
+    mock_snapshot_cfg.return_value = (str(tmp_path), 3600)
+    item = {"pk": f"{DEFAULT_GROUP_ID}#Patryk", "user_id": "Patryk", "timestamp": "2025-10-01T10:00:00"}
+    mock_table = MagicMock()
+    mock_table.query.side_effect = lambda **kw: {
+        "Items": [i for i in [item] if aws._matches(kw["KeyConditionExpression"], i)]
+    }
+    mock_get_table.return_value = mock_table
+
+    data.load_items("game_scores")
+    items = data.load_items("game_scores")
+
+    assert items == [item]
+    mock_table.scan.assert_not_called()
+    loaded, watermark = snapshot.load_latest(str(tmp_path), f"game_scores.{DEFAULT_GROUP_ID}")
+    assert loaded == items
+    assert watermark == "2025-10-01T10:00:00"
+
+
+def test_back_dated_writes_reach_cache_and_survive_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_items_cache", {})
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: (str(tmp_path), 0))
+    with patch("streamlit.warning"):
+        table = aws.get_ddb_table({}, "game_scores")
+    with patch("utils.data.aws.get_ddb_table", return_value=table):
+        data.save_score("Patryk", "Queens", 1, [90], ["seconds"])
+        assert len(data.load_items("game_scores")) == 1  # snapshot written, watermark = now
+
+        start = date(2025, 10, 1)
+        data.generate_test_data("Mikuś", "Queens", start, start + timedelta(days=4))
+        assert len(data.load_items("game_scores")) == 6
+
+        data._items_cache.clear()  # a new process starts from the snapshot
+        assert len(data.load_items("game_scores")) == 6
+
+
+@patch("utils.data.aws.get_ddb_table")
+def test_fetch_group_raises_on_tables_keyed_by_user_id(mock_get_table):
+    from botocore.exceptions import ClientError
+
+    mock_get_table.return_value.query.side_effect = ClientError(
+        {"Error": {"Code": "ValidationException", "Message": "Query condition missed key schema element"}}, "Query")
+    with pytest.raises(RuntimeError, match="Moving to the pk key"):
+        data.fetch_group("game_scores")
+
+
+def test_delta_query_overlaps_the_watermark():
+    assert data._delta_since("2025-10-03T10:30:00+00:00") == "2025-10-03T10:20:00+00:00"
+    assert data._delta_since(None) is None
+
+
+@patch("utils.data.parser.parse_post_cached")
+@patch("utils.data.aws.get_ddb_table")
+def test_save_post_reuses_preview_parse(mock_get_table, mock_parse):
+    mock_table = MagicMock()
+    mock_get_table.return_value = mock_table
+    parsed = {"game_name": "Queens", "game_number": 10, "scores": [90]}
+
+    data.save_post("Mikuś", "Queens #10 | 1:30", parsed=parsed)
+
+    mock_parse.assert_not_called()
+    score_item = mock_table.put_item.call_args_list[1][1]["Item"]
+    assert score_item["scores"] == [90]
+
+
+@pytest.fixture
+def seeded_scores(tmp_path, monkeypatch):
+    """A shared in-memory scores table with two test batches and one real score."""
+    monkeypatch.setattr(data, "_items_cache", {})
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: (str(tmp_path), 3600))
+    with patch("streamlit.warning"):
+        table = aws.get_ddb_table({}, "game_scores")
+    with patch("utils.data.aws.get_ddb_table", return_value=table):
+        start = date(2025, 10, 1)
+        first = data.generate_test_data("Mikuś", "Queens", start, start + timedelta(days=29), batch_id="b1")
+        second = data.generate_test_data("Maciuś", "Zip", start, start + timedelta(days=9), batch_id="b2")
+        data.save_score("Patryk", "Queens", 1, [90], ["seconds"], game_date="2025-10-01")
+        yield table, first, second
+
+
+def test_purge_one_batch_by_group_query(seeded_scores):
+    table, first, second = seeded_scores
+    calls = []
+
+    assert data.list_test_batches() == {"b1": 30, "b2": 10}
+    result = data.purge_test_data(first, group_id=DEFAULT_GROUP_ID, chunk_size=7,
+                                  progress=lambda done, total: calls.append((done, total)))
+
+    assert result == {"found": 30, "deleted": 30, "batches": ["b1"]}
+    assert calls[-1] == (30, 30) and len(calls) == 5
+    assert sorted({i.get(data.TEST_BATCH_ATTR) for i in table.data}, key=str) == [None, "b2"]
+    assert data.list_test_batches() == {"b2": 10}  # evicted from the cache too
+
+
+def test_purge_all_batches_by_parallel_scan(seeded_scores):
+    table, _, _ = seeded_scores
+
+    result = data.purge_test_data(segments=4, workers=4, chunk_size=3)
+
+    assert (result["deleted"], result["batches"]) == (40, ["b1", "b2"])
+    assert [i["user_id"] for i in table.data] == ["Patryk"]
+
+
+def test_new_batch_is_listed_after_scores_were_loaded(seeded_scores):
+    data.load_items("game_scores")
+    data.generate_test_data("Patryk", "Zip", date(2025, 11, 1), date(2025, 11, 3), batch_id="b3")
+
+    assert data.list_test_batches() == {"b1": 30, "b2": 10, "b3": 3}
+
+
+def test_listing_batches_reads_the_cache_not_tagged_queries(seeded_scores):
+    table, _, _ = seeded_scores
+    with patch.object(table, "query", wraps=table.query) as query:
+        assert data.list_test_batches() == {"b1": 30, "b2": 10}
+    assert all("FilterExpression" not in c.kwargs for c in query.call_args_list)
+
+
+def test_purge_opens_one_table_per_worker(seeded_scores):
+    data.aws.get_ddb_table.reset_mock()
+
+    data.purge_test_data(group_id=DEFAULT_GROUP_ID, workers=2, chunk_size=2)
+
+    assert data.aws.get_ddb_table.call_count <= 1 + 2  # the tagged query, then one per worker
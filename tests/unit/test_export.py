@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+from utils import aws, export, groups
+from constants import DEFAULT_GROUP_ID
+
+
+def _score(user, day, game="Zip"):
+    return {
+        "pk": groups.partition_key(DEFAULT_GROUP_ID, user), "group_id": DEFAULT_GROUP_ID,
+        "user_id": user, "game_name": game, "game_number": Decimal(day),
+        "scores": [Decimal("30"), Decimal("2")], "units": ["seconds", "backtracks"],
+        "game_date": f"2025-10-{day:02d}", "timestamp": f"2025-10-{day:02d}T10:00:00",
+    }
+
+
+ITEMS = [_score("Mikuś", 1), _score("Maciuś", 2), _score("Mikuś", 3, game="Queens"), _score("Patryk", 4)]
+
+
+@pytest.fixture
+def table():
+    with patch("streamlit.warning"):
+        mock_table = aws.get_ddb_table({}, "game_scores")
+    for item in ITEMS:
+        mock_table.put_item(Item=item)
+    with patch("utils.export.aws.get_ddb_table", return_value=mock_table), \
+         patch("utils.export.groups.get_group", return_value=groups.default_group()):
+        yield mock_table
+
+
+def test_filter_items():
+    result = export.filter_items(ITEMS, "game_scores", game="Zip", players=["Mikuś", "Patryk"],
+                                 date_from="2025-10-01", date_to="2025-10-03")
+    assert [i["game_date"] for i in result] == ["2025-10-01"]
+
+
+def test_iter_pages_pushes_filters_down_and_pages(table):
+    pages = list(export.iter_pages({}, "game_scores", game="Zip", date_from="2025-10-02", page_size=1))
+    rows = [i for page in pages for i in page]
+    assert sorted(i["user_id"] for i in rows) == ["Maciuś", "Patryk"]
+
+
+def test_iter_pages_keeps_unmigrated_dates_in_range(table):
+    for day in (2, 9):
+        legacy = dict(_score("Maciuś", day), timestamp=f"2025-10-{day:02d}T12:00:00", game_date=f"{day:02d}-10-2025")
+        table.put_item(Item=legacy)   # no schema_version: written before migration 1
+    pages = list(export.iter_pages({}, "game_scores", date_from="2025-10-02", date_to="2025-10-04"))
+    rows = [i for page in pages for i in page]
+    assert sorted(i["game_date"] for i in rows) == ["02-10-2025", "2025-10-02", "2025-10-03", "2025-10-04"]
+
+
+def test_write_csv():
+    out = io.BytesIO()
+    assert export.write(export.chunked(ITEMS[:2], size=1), "game_scores", "csv", out) == 2
+
+    rows = list(csv.DictReader(io.StringIO(out.getvalue().decode("utf-8"))))
+    assert rows[0]["user_id"] == "Mikuś"
+    assert json.loads(rows[0]["scores"]) == [30, 2]
+
+
+def test_write_jsonl():
+    out = io.BytesIO()
+    export.write([ITEMS[:2]], "game_scores", "jsonl", out)
+    lines = out.getvalue().decode("utf-8").splitlines()
+    assert [json.loads(line)["game_number"] for line in lines] == [1, 2]
+
+
+def test_write_parquet():
+    import pyarrow.parquet as pq
+
+    out = io.BytesIO()
+    export.write(export.chunked(ITEMS, size=3), "game_scores", "parquet", out)
+    out.seek(0)
+    table = pq.read_table(out)
+    assert table.num_rows == 4
+    assert table.column("scores").to_pylist()[0] == [30.0, 2.0]
+
+
+def test_invalid_format():
+    with pytest.raises(ValueError):
+        export.write([], "game_scores", "xlsx", io.BytesIO())
@@ -0,0 +1,149 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from utils import data, feed
+from constants import DEFAULT_GROUP_ID
+
+
+def test_local_log_feed_reads_only_new_records(tmp_path):
+    log = feed.LocalLogFeed(str(tmp_path / "feed.jsonl"))
+    log.publish("game_scores", feed.INSERT, {"pk": "g#a", "timestamp": "t1"})
+    position = log.latest_position()
+    log.publish("game_scores", feed.INSERT, {"pk": "g#a", "timestamp": "t2"})
+
+    records, position = log.read(position)
+    assert [r["item"]["timestamp"] for r in records] == ["t2"]
+    assert log.read(position) == ([], position)
+
+
+def test_local_log_feed_skips_partial_record(tmp_path):
+    path = tmp_path / "feed.jsonl"
+    log = feed.LocalLogFeed(str(path))
+    log.publish("game_scores", feed.INSERT, {"timestamp": "t1"})
+    with open(path, "a") as f:
+        f.write('{"table": "game_scores", "ev')
+
+    records, position = log.read(0)
+    assert len(records) == 1
+    assert position < path.stat().st_size
+
+
+def test_subscriber_applies_deltas_to_cached_items(tmp_path, monkeypatch):
+    cache_key = ("game_scores", DEFAULT_GROUP_ID)
+    old = {"pk": f"{DEFAULT_GROUP_ID}#Mikuś", "group_id": DEFAULT_GROUP_ID, "timestamp": "t1"}
+    monkeypatch.setattr(data, "_items_cache", {cache_key: data._new_entry([old], "t1")})
+    monkeypatch.setattr(data, "_versions", {})
+
+    log = feed.LocalLogFeed(str(tmp_path / "feed.jsonl"))
+    subscriber = feed.Subscriber(log, data._apply_changes, poll_seconds=60)
+    new = {"pk": f"{DEFAULT_GROUP_ID}#Patryk", "group_id": DEFAULT_GROUP_ID, "timestamp": "t2"}
+    log.publish("game_scores", feed.INSERT, new)
+    log.publish("game_scores", feed.REMOVE, old)
+    log.publish("game_scores", feed.INSERT, {"pk": "other#Ala", "group_id": "other", "timestamp": "t3"})
+
+    assert subscriber.poll() == 3
+    subscriber.stop()
+
+    entry = data._items_cache[cache_key]
+    assert list(entry["items"].values()) == [new]
+    assert entry["watermark"] == "t2"
+    assert data.data_version("game_scores") == 2
+    assert ("game_scores", "other") not in data._items_cache
+
+
+def test_load_items_serves_cache_when_feed_is_live(monkeypatch):
+    cache_key = ("game_scores", DEFAULT_GROUP_ID)
+    entry = data._new_entry()
+    entry["feed_epoch"] = 0
+    monkeypatch.setattr(data, "_items_cache", {cache_key: entry})
+    with patch("utils.data._feed_epoch", return_value=0), \
+         patch("utils.data.fetch_group") as mock_fetch:
+        assert data.load_items("game_scores") == []
+    mock_fetch.assert_not_called()
+
+
+def test_load_items_falls_back_to_delta_queries_while_feed_fails(monkeypatch):
+    cache_key = ("game_scores", DEFAULT_GROUP_ID)
+    entry = data._new_entry()
+    entry["feed_epoch"] = 0
+    monkeypatch.setattr(data, "_items_cache", {cache_key: entry})
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: ("unused", 3600))
+    with patch("utils.data.fetch_group", return_value=[]) as mock_fetch:
+        with patch("utils.data._feed_epoch", return_value=None):  # last poll failed
+            data.load_items("game_scores")
+            data.load_items("game_scores")
+        with patch("utils.data._feed_epoch", return_value=1):  # recovered
+            data.load_items("game_scores")
+            data.load_items("game_scores")
+    assert mock_fetch.call_count == 3
+
+
+def test_subscriber_marks_itself_unhealthy_until_a_poll_succeeds():
+    failing = MagicMock()
+    failing.latest_position.return_value = 0
+    failing.lost = 0
+    failing.read.side_effect = [RuntimeError("stream gone"), ([], 0)]
+    subscriber = feed.Subscriber(failing, MagicMock(), poll_seconds=60)
+
+    with pytest.raises(RuntimeError):
+        subscriber.poll()
+    assert not subscriber.healthy and subscriber.last_error == "RuntimeError: stream gone"
+    assert subscriber.epoch == 1
+    subscriber.poll()
+    subscriber.stop()
+    assert subscriber.healthy and subscriber.epoch == 1
+
+
+def test_dynamo_stream_feed_converts_records():
+    streams_client = MagicMock()
+    streams_client.describe_stream.return_value = {"StreamDescription": {"Shards": [{"ShardId": "s1"}]}}
+    streams_client.get_shard_iterator.return_value = {"ShardIterator": "it-0"}
+    streams_client.get_records.return_value = {
+        "Records": [{
+            "eventName": "INSERT",
+            "dynamodb": {"NewImage": {
+                "pk": {"S": "g#Ala"}, "timestamp": {"S": "t1"}, "scores": {"L": [{"N": "5"}]},
+            }},
+        }],
+        "NextShardIterator": "it-1",
+    }
+    ddb_client = MagicMock()
+    ddb_client.describe_table.return_value = {"Table": {"LatestStreamArn": "arn:stream"}}
+
+    with patch("utils.feed.aws.get_client", side_effect=[streams_client, ddb_client]):
+        stream_feed = feed.DynamoStreamFeed({}, ["game_scores"])
+    records, position = stream_feed.read({})
+
+    assert records == [{"table": "game_scores", "event": "INSERT",
+                        "item": {"pk": "g#Ala", "timestamp": "t1", "scores": [5]}}]
+    assert position == {"s1": "it-1"}
+
+
+def test_dynamo_stream_feed_recovers_expired_iterators_and_caches_shards():
+    from botocore.exceptions import ClientError
+
+    def record(seq):
+        return {"eventName": "INSERT", "dynamodb": {
+            "SequenceNumber": seq, "NewImage": {"pk": {"S": "g#Ala"}, "timestamp": {"S": seq}}}}
+
+    streams_client = MagicMock()
+    streams_client.describe_stream.return_value = {"StreamDescription": {"Shards": [{"ShardId": "s1"}]}}
+    streams_client.get_shard_iterator.return_value = {"ShardIterator": "it-resumed"}
+    streams_client.get_records.side_effect = [
+        {"Records": [record("100")], "NextShardIterator": "it-1"},
+        ClientError({"Error": {"Code": "ExpiredIteratorException", "Message": "expired"}}, "GetRecords"),
+        {"Records": [record("101")], "NextShardIterator": "it-2"},
+    ]
+    ddb_client = MagicMock()
+    ddb_client.describe_table.return_value = {"Table": {"LatestStreamArn": "arn:stream"}}
+    with patch("utils.feed.aws.get_client", side_effect=[streams_client, ddb_client]):
+        stream_feed = feed.DynamoStreamFeed({}, ["game_scores"])
+
+    _, position = stream_feed.read({"s1": "it-0"})
+    records, position = stream_feed.read(position)
+
+    assert [r["item"]["timestamp"] for r in records] == ["101"]
+    assert position == {"s1": "it-2"}
+    streams_client.get_shard_iterator.assert_called_once_with(
+        StreamArn="arn:stream", ShardId="s1", ShardIteratorType="AFTER_SEQUENCE_NUMBER", SequenceNumber="100")
+    assert stream_feed.lost == 0
+    assert streams_client.describe_stream.call_count == 1
@@ -0,0 +1,73 @@
+import pytest
+from unittest.mock import patch
+from utils import aws, groups
+from constants import DEFAULT_GROUP_ID, PLAYERS, COLORS
+
+
+@pytest.fixture(autouse=True)
+def registry():
+    """A single in-memory groups table shared by all lookups of a test."""
+    groups.invalidate()
+    with patch("streamlit.warning"):
+        table = aws.get_ddb_table({}, groups.GROUPS_TABLE)
+    with patch("utils.groups.aws.get_ddb_table", return_value=table):
+        yield table
+    groups.invalidate()
+
+
+def test_default_group_comes_from_constants():
+    group = groups.get_group(DEFAULT_GROUP_ID)
+    assert group["players"] == PLAYERS
+    assert group["colors"] == COLORS
+
+
+def test_unknown_group_raises():
+    with pytest.raises(ValueError):
+        groups.get_group("nope")
+
+
+def test_save_and_list_groups(registry):
+    groups.save_group("office", "Office League", ["Ala", "Ola"])
+
+    group = groups.get_group("office")
+    assert group["players"] == ["Ala", "Ola"]
+    assert set(group["colors"]) == {"Ala", "Ola"}
+    assert [g["group_id"] for g in groups.list_groups()] == [DEFAULT_GROUP_ID, "office"]
+
+
+def test_lookups_are_cached(registry):
+    groups.save_group("office", "Office League", ["Ala"])
+    with patch.object(registry, "get_item", wraps=registry.get_item) as get_item:
+        groups.get_group("office")
+        groups.get_group("office")
+    assert get_item.call_count == 1
+
+
+def test_invalid_group_id():
+    with pytest.raises(ValueError):
+        groups.save_group("Bad Id!", "x", ["Ala"])
+
+
+def test_validate_player():
+    groups.validate_player(DEFAULT_GROUP_ID, PLAYERS[0])
+    with pytest.raises(ValueError):
+        groups.validate_player(DEFAULT_GROUP_ID, "Stranger")
+
+
+def test_partition_key():
+    assert groups.partition_key("office", "Ala") == "office#Ala"
+
+
+def test_registry_errors_raise_and_are_not_cached(registry):
+    groups.save_group("office", "Office League", ["Ala"])
+    with patch.object(registry, "get_item", side_effect=RuntimeError("throttled")):
+        with pytest.raises(RuntimeError):
+            groups.get_group("office")
+        with pytest.raises(RuntimeError):
+            groups.get_group(DEFAULT_GROUP_ID)  # not silently replaced by the constants
+    assert groups.get_group("office")["players"] == ["Ala"]
+
+    with patch("utils.groups.aws.get_ddb_table", return_value=None):
+        with pytest.raises(RuntimeError):
+            groups.list_groups()
+    assert [g["group_id"] for g in groups.list_groups()] == [DEFAULT_GROUP_ID, "office"]
@@ -0,0 +1,52 @@
+from utils.lru import LRUCache
+
+
+def test_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_info_counts_hits_and_misses():
+    cache = LRUCache(maxsize=4)
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    info = cache.info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+    assert info["hit_rate"] == 0.5
+
+
+def test_memory_cap_evicts_oldest_entries():
+    cache = LRUCache(maxsize=10, max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("c", "xxxx")
+
+    assert cache.get("a") is None
+    assert cache.info()["bytes"] == 8
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(maxsize=10, max_bytes=10, sizeof=len)
+    cache.put("a", "xxxxxx")
+    cache.put("a", "xx")
+    cache.put("b", "xxxxxx")
+
+    assert (cache.get("a"), cache.info()["bytes"]) == ("xx", 8)
+
+
+def test_values_over_the_cap_are_not_kept():
+    cache = LRUCache(maxsize=10, max_bytes=4, sizeof=len)
+    cache.put("a", "xx")
+    cache.put("big", "xxxxxxxx")
+
+    assert cache.get("big") is None
+    assert cache.get("a") == "xx"
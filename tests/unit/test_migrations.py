@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import patch
+from utils import aws, migrations
+from constants import DEFAULT_GROUP_ID
+
+
+def _legacy_scores(n):
+    return [
+        {"pk": f"{DEFAULT_GROUP_ID}#Mikuś", "user_id": "Mikuś", "timestamp": f"2025-10-01T10:00:{i:02d}", "game_name": "Zip",
+         "scores": [30, 2], "game_date": "01-10-2025"}
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def table():
+    """One in-memory game_scores table shared by every scan segment."""
+    with patch("streamlit.warning"):
+        mock_table = aws.get_ddb_table({}, "game_scores")
+    with patch("utils.migrations.aws.get_ddb_table", return_value=mock_table):
+        yield mock_table
+
+
+def test_iso_date():
+    assert migrations.iso_date("03-10-2025") == "2025-10-03"
+    assert migrations.iso_date("2025-10-03") == "2025-10-03"
+    assert migrations.iso_date("soon") == "soon"
+
+
+def test_upgrade_applies_pending_migrations():
+    item = migrations.upgrade(_legacy_scores(1)[0], "game_scores")
+    assert item["game_date"] == "2025-10-01"
+    assert item["group_id"] == DEFAULT_GROUP_ID
+    assert item["units"] == ["seconds", "backtracks"]
+    assert item["schema_version"] == migrations.latest_version("game_scores")
+    assert migrations.upgrade(item, "game_scores") is None
+
+
+def test_migrate_rewrites_all_segments(table, tmp_path):
+    for item in _legacy_scores(20):
+        table.put_item(Item=item)
+
+    result = migrations.migrate({}, "game_scores", segments=3, page_size=4,
+                                checkpoint_path=str(tmp_path / "ckpt.json"))
+
+    assert result["scanned"] == 20 and result["changed"] == 20
+    assert len(table.data) == 20
+    assert all(i["game_date"] == "2025-10-01" for i in table.data)
+
+
+def test_dry_run_writes_nothing(table, tmp_path):
+    for item in _legacy_scores(5):
+        table.put_item(Item=item)
+    checkpoint = tmp_path / "ckpt.json"
+
+    result = migrations.migrate({}, "game_scores", dry_run=True, checkpoint_path=str(checkpoint))
+
+    assert result["changed"] == 5
+    assert all(i["game_date"] == "01-10-2025" for i in table.data)
+    assert not checkpoint.exists()
+
+
+def test_interrupted_migration_resumes_from_checkpoint(table, tmp_path):
+    for item in _legacy_scores(10):
+        table.put_item(Item=item)
+    checkpoint = str(tmp_path / "ckpt.json")
+
+    pages = []
+
+    def fail_after_first_page(segment, scanned, changed):
+        pages.append(scanned)
+        raise RuntimeError("interrupted")
+
+    with pytest.raises(RuntimeError):
+        migrations.migrate({}, "game_scores", segments=1, page_size=3,
+                           checkpoint_path=checkpoint, progress=fail_after_first_page)
+    assert pages == [3]
+
+    result = migrations.migrate({}, "game_scores", segments=1, page_size=3, checkpoint_path=checkpoint)
+    assert result["scanned"] == 10
+    assert result["changed"] == 10
+
+
+def test_finished_migration_clears_its_checkpoint(table, tmp_path):
+    checkpoint = tmp_path / "ckpt.json"
+    for item in _legacy_scores(5):
+        table.put_item(Item=item)
+    first = migrations.migrate({}, "game_scores", segments=2, page_size=2, checkpoint_path=str(checkpoint))
+    assert not checkpoint.exists()
+
+    for item in _legacy_scores(8)[5:]:
+        table.put_item(Item=item)
+    second = migrations.migrate({}, "game_scores", segments=2, page_size=2, checkpoint_path=str(checkpoint))
+
+    assert (first["scanned"], first["changed"]) == (5, 5)
+    assert (second["scanned"], second["changed"]) == (8, 3)
+    assert all(i["game_date"] == "2025-10-01" for i in table.data)
+
+
+def test_rekey_copies_user_keyed_table_into_pk_keyed_one(tmp_path):
+    with patch("streamlit.warning"):
+        old = aws.get_ddb_table({}, "legacy")  # keyed by (user_id, timestamp)
+        new = aws.get_ddb_table({}, "game_scores")
+    for item in _legacy_scores(10):
+        old.put_item(Item={k: v for k, v in item.items() if k != "pk"})
+
+    tables = {"game_scores": old, "game_scores_v2": new}
+    with patch("utils.migrations.aws.get_ddb_table", side_effect=lambda cfg, name, physical: tables[physical]):
+        result = migrations.rekey({}, "game_scores", "game_scores", "game_scores_v2", segments=2,
+                                  page_size=3, checkpoint_path=str(tmp_path / "ckpt.json"))
+
+    assert result == {"scanned": 10, "copied": 10}
+    assert not (tmp_path / "ckpt.json").exists()
+    assert len(old.data) == 10 and all("pk" not in i for i in old.data)
+    assert sorted(i["timestamp"] for i in new.data) == sorted(i["timestamp"] for i in old.data)
+    assert all(i["pk"] == f"{DEFAULT_GROUP_ID}#Mikuś" and i["game_date"] == "2025-10-01" for i in new.data)
@@ -64,3 +64,26 @@ def test_parse_post_variations(text, expected):
 def test_unknown_format(text):
     with pytest.raises(ValueError):
         parse_post(text)
+
+
+def test_parse_post_cached_hits_on_same_text():
+    from utils import parser
+
+    parser._parse_cache.clear()
+    first = parser.parse_post_cached("Zip #21 | 2:15 | 3 backtracks")
+    first["scores"].append(999)  # callers get their own copy
+    second = parser.parse_post_cached("  Zip #21 | 2:15 | 3 backtracks\r\n")
+
+    assert second["scores"] == [135, 3]
+    assert parser.parse_cache_info()["hits"] == 1
+    assert parser.parse_cache_info()["misses"] == 1
+
+
+def test_parse_post_cached_remembers_failures():
+    from utils import parser
+
+    parser._parse_cache.clear()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            parser.parse_post_cached("Completely unrelated content")
+    assert parser.parse_cache_info()["hits"] == 1
@@ -0,0 +1,147 @@
+import pytest
+from unittest.mock import patch
+from utils import aws, data, feed, groups, search
+from constants import DEFAULT_GROUP_ID
+
+
+def _post(user, minute, raw_post):
+    return {"pk": groups.partition_key(DEFAULT_GROUP_ID, user), "group_id": DEFAULT_GROUP_ID,
+            "user_id": user, "raw_post": raw_post, "timestamp": f"2025-10-01T10:{minute:02d}:00"}
+
+
+POSTS = [
+    _post("Mikuś", 1, "Zip #199 | 0:36 🏁\nWith 18 backtracks 🛑\nlnkd.in/zip."),
+    _post("Maciuś", 2, "Queens #520 | 1:57\nFirst 👑s: 🟦 🟩 🟫\nlnkd.in/queens."),
+    _post("Patryk", 3, "Zip #200 | 1:10 | 3 backtracks"),
+    _post("Mikuś", 4, "Dzień dobry, dziś bez gier"),
+]
+
+
+def _key(item):
+    return (item["pk"], item["timestamp"])
+
+
+@pytest.fixture
+def index():
+    index = search.SearchIndex()
+    for post in POSTS:
+        index.add(post)
+    return index
+
+
+def test_tokenize_folds_case_and_diacritics():
+    assert search.tokenize("Mikuś ZIP #199, Dzień Łódź") == ["mikus", "zip", "199", "dzien", "lodz"]
+
+
+def test_search_covers_text_game_number_and_player(index):
+    assert {k for k, _ in index.search("zip")} == {_key(POSTS[0]), _key(POSTS[2])}
+    assert [k for k, _ in index.search("520")] == [_key(POSTS[1])]
+    assert {k for k, _ in index.search("mikus")} == {_key(POSTS[0]), _key(POSTS[3])}
+
+
+def test_all_words_must_match_and_last_word_is_a_prefix(index):
+    assert [k for k, _ in index.search("zip mikuś")] == [_key(POSTS[0])]
+    assert [k for k, _ in index.search("dzie")] == [_key(POSTS[3])]
+    assert index.search("zip queens") == []
+
+
+def test_rarer_terms_rank_higher(index):
+    # "backtracks" is in both Zip posts, "18" only in the first
+    ranked = index.search("backtracks 18")
+    assert [k for k, _ in ranked] == [_key(POSTS[0])]
+    scores = dict(index.search("zip"))
+    assert scores[_key(POSTS[0])] > 0 and scores[_key(POSTS[2])] > 0
+
+
+def test_re_adding_and_removing_posts(index):
+    index.add(dict(POSTS[3], raw_post="Queens #521 | 2:00"))
+    assert len(index) == 4
+    assert index.search("dzien") == []
+    assert {k for k, _ in index.search("queens")} == {_key(POSTS[1]), _key(POSTS[3])}
+
+    index.remove(_key(POSTS[1]))
+    assert [k for k, _ in index.search("queens")] == [_key(POSTS[3])]
+
+
+def test_index_persists_with_watermark(index, tmp_path):
+    index.path = str(tmp_path / "posts.json")
+    index.save()
+
+    loaded = search.SearchIndex.load(index.path)
+    assert loaded.watermark == POSTS[3]["timestamp"]
+    assert loaded.search("queens 520") == index.search("queens 520")
+    assert len(search.SearchIndex.load(str(tmp_path / "missing.json"))) == 0
+
+    loaded.remove(_key(POSTS[1]))
+    assert loaded.search("queens") == [] and "520" not in loaded._postings
+
+
+def test_save_soon_writes_a_burst_of_changes_once(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(search, "SAVE_DELAY_SECONDS", 0.05)
+    index.path = str(tmp_path / "posts.json")
+    with patch.object(index, "save", wraps=index.save) as save:
+        index.save_soon()
+        timer = index._timer
+        index.add(_post("Patryk", 5, "Tango #300 | 0:45"))
+        index.save_soon()
+        timer.join()
+
+    assert save.call_count == 1
+    assert search.SearchIndex.load(index.path).watermark == "2025-10-01T10:05:00"
+
+
+@pytest.fixture
+def posts_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "_items_cache", {})
+    monkeypatch.setattr(data, "_search_indexes", {})
+    monkeypatch.setattr(data.st, "secrets", {"search": {"directory": str(tmp_path)}})
+    monkeypatch.setattr(search.SearchIndex, "save_soon", search.SearchIndex.save)  # write right away
+    with patch("streamlit.warning"):
+        table = aws.get_ddb_table({}, "raw_game_posts")
+    for post in POSTS:
+        table.put_item(Item=post)
+    with patch("utils.data.aws.get_ddb_table", return_value=table), \
+         patch("utils.data.groups.get_group", return_value=groups.default_group()):
+        yield table
+
+
+def test_search_posts_reads_only_matching_items(posts_table):
+    with patch.object(posts_table, "get_item", wraps=posts_table.get_item) as get_item:
+        results = data.search_posts("queens")
+    assert [r["user_id"] for r in results] == ["Maciuś"]
+    assert get_item.call_count == 1
+
+
+def test_save_post_updates_a_loaded_index_and_its_file(posts_table, tmp_path):
+    data.search_posts("zip")  # builds and persists the index
+    post = data.save_post("Patryk", "Tango #300 | 0:45")
+
+    assert [r["timestamp"] for r in data.search_posts("tango")] == [post["timestamp"]]
+    saved = search.SearchIndex.load(str(tmp_path / f"raw_game_posts.{DEFAULT_GROUP_ID}.json"))
+    assert saved.watermark == post["timestamp"]
+    assert (post["pk"], post["timestamp"]) in saved
+
+
+def test_loaded_index_catches_up_from_its_watermark(posts_table, tmp_path):
+    data.search_posts("zip")
+    later = _post("Maciuś", 30, "Crossclimb #88 | 1:20")
+    posts_table.put_item(Item=later)
+
+    data._search_indexes.clear()  # a new process loads the persisted index
+    with patch("utils.data.fetch_group", wraps=data.fetch_group) as fetch_group:
+        assert [r["raw_post"] for r in data.search_posts("crossclimb")] == [later["raw_post"]]
+    assert fetch_group.call_args.kwargs["since"] == data._delta_since(POSTS[3]["timestamp"])
+
+
+def test_posts_are_indexed_once_when_a_feed_delivers_them(posts_table, tmp_path):
+    data.search_posts("zip")
+    index = data._search_indexes[DEFAULT_GROUP_ID]
+    log = feed.LocalLogFeed(str(tmp_path / "feed.jsonl"))
+    with patch("utils.data._get_feed", return_value=log), \
+         patch.object(index, "add", wraps=index.add) as add:
+        post = data.save_post("Patryk", "Tango #300 | 0:45")
+        add.assert_not_called()
+        data._apply_changes(log.read(0)[0])  # what the subscriber does
+
+    add.assert_called_once_with(post)
+    assert [r["timestamp"] for r in data.search_posts("tango")] == [post["timestamp"]]
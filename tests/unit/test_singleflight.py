@@ -0,0 +1,119 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from utils import aws, data, groups, singleflight
+from constants import DEFAULT_GROUP_ID, PLAYERS
+
+THREADS = 32
+
+
+def _wait_for(flights, calls, timeout=5.0):
+    """Block until `calls` callers have reached the single-flight layer."""
+    deadline = time.monotonic() + timeout
+    while flights.info()["calls"] < calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class SlowTable:
+    """Stand-in table whose reads hold until every test thread has asked for them."""
+
+    def __init__(self, items, flights, callers):
+        self.items = items
+        self.flights = flights
+        self.callers = callers
+        self.scans = 0
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def scan(self, **kwargs):
+        with self._lock:
+            self.scans += 1
+        _wait_for(self.flights, self.callers)
+        return {"Items": list(self.items)}
+
+    def query(self, KeyConditionExpression, **kwargs):
+        with self._lock:
+            self.queries += 1
+        _wait_for(self.flights, self.callers)
+        return {"Items": [i for i in self.items if aws._matches(KeyConditionExpression, i)]}
+
+
+@pytest.fixture
+def flights(monkeypatch):
+    flights = singleflight.SingleFlight()
+    monkeypatch.setattr(data, "_flights", flights)
+    return flights
+
+
+def test_sequential_calls_are_not_coalesced():
+    flights = singleflight.SingleFlight()
+    assert [flights.do("k", lambda: n) for n in range(3)] == [0, 1, 2]
+    assert flights.info() == {"calls": 3, "executions": 3, "coalesced": 0, "in_flight": 0}
+
+
+def test_waiters_share_the_leaders_exception():
+    flights = singleflight.SingleFlight()
+    release = threading.Event()
+
+    def failing():
+        release.wait(5)
+        raise RuntimeError("throttled")
+
+    def call():
+        try:
+            flights.do("k", failing)
+        except RuntimeError as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(call) for _ in range(4)]
+        _wait_for(flights, 4)
+        release.set()
+        assert [f.result() for f in futures] == ["throttled"] * 4
+    assert flights.info()["executions"] == 1
+    assert flights.info()["in_flight"] == 0
+
+
+def test_different_keys_run_independently():
+    flights = singleflight.SingleFlight()
+    assert flights.do("a", lambda: "a") == "a"
+    assert flights.do("b", lambda: "b") == "b"
+    assert flights.info()["executions"] == 2
+
+
+def test_concurrent_fetch_all_runs_one_scan(flights):
+    items = [{"pk": f"{DEFAULT_GROUP_ID}#Mikuś", "timestamp": str(n)} for n in range(100)]
+    table = SlowTable(items, flights, THREADS)
+    barrier = threading.Barrier(THREADS)
+
+    def session():
+        barrier.wait()
+        return data.fetch_all("game_scores")
+
+    with patch("utils.data.aws.get_ddb_table", return_value=table), \
+         ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda _: session(), range(THREADS)))
+
+    assert table.scans == 1
+    assert all(r == items for r in results)
+    assert len({id(r) for r in results}) == THREADS  # every caller gets its own list
+    assert flights.info() == {"calls": THREADS, "executions": 1, "coalesced": THREADS - 1, "in_flight": 0}
+
+
+def test_concurrent_load_items_share_one_fetch(flights, monkeypatch, tmp_path):
+    monkeypatch.setattr(data, "_items_cache", {})
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: (str(tmp_path), 3600))
+    items = [{"pk": groups.partition_key(DEFAULT_GROUP_ID, p), "user_id": p, "timestamp": "2025-10-01T10:00:00"}
+             for p in PLAYERS]
+    table = SlowTable(items, flights, THREADS)
+
+    with patch("utils.data.aws.get_ddb_table", return_value=table), \
+         patch("utils.data.groups.get_group", return_value=groups.default_group()), \
+         ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda _: data.load_items("game_scores"), range(THREADS)))
+
+    assert table.queries == len(PLAYERS)  # one query per player partition, not per session
+    assert all(sorted(i["user_id"] for i in r) == sorted(PLAYERS) for r in results)
+    assert flights.info()["coalesced"] == THREADS - 1
@@ -0,0 +1,40 @@
+import os
+from decimal import Decimal
+from utils import snapshot
+
+
+def test_snapshot_round_trip(tmp_path):
+    items = [
+        {"user_id": "Mikuś", "timestamp": "2025-10-01T10:00:00", "scores": [Decimal("5"), Decimal("95")]},
+        {"user_id": "Patryk", "timestamp": "2025-10-02T10:00:00", "raw_post": "Zip #1 | 0:30"},
+    ]
+    snapshot.write_snapshot(str(tmp_path), "game_scores", items, watermark="2025-10-02T10:00:00")
+
+    loaded, watermark = snapshot.load_latest(str(tmp_path), "game_scores")
+    assert watermark == "2025-10-02T10:00:00"
+    assert loaded[0] == {"user_id": "Mikuś", "timestamp": "2025-10-01T10:00:00", "scores": [5, 95]}
+    # attributes an item never had are not invented
+    assert "scores" not in loaded[1]
+
+
+def test_load_latest_without_snapshot(tmp_path):
+    assert snapshot.load_latest(str(tmp_path), "game_scores") == (None, None)
+
+
+def test_old_snapshots_are_pruned(tmp_path, monkeypatch):
+    clock = iter([1.0, 2.0, 3.0])
+    monkeypatch.setattr(snapshot.time, "time", lambda: next(clock))
+    for n in range(3):
+        snapshot.write_snapshot(str(tmp_path), "posts", [{"n": n}], keep=2)
+
+    assert len(os.listdir(tmp_path)) == 2
+    loaded, _ = snapshot.load_latest(str(tmp_path), "posts")
+    assert loaded == [{"n": 2}]
+
+
+def test_corrupt_snapshot_falls_back_to_older(tmp_path):
+    snapshot.write_snapshot(str(tmp_path), "posts", [{"n": 1}])
+    (tmp_path / "posts-9999999999999.arrow").write_bytes(b"not arrow")
+
+    loaded, _ = snapshot.load_latest(str(tmp_path), "posts")
+    assert loaded == [{"n": 1}]
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+from constants import STARTUP_IMPORT_BUDGET_SECONDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEAVY_MODULES = ["pandas", "plotly.express", "boto3", "pyarrow"]
+
+COLD_IMPORT = """
+import sys, time
+start = time.perf_counter()
+import app
+print(time.perf_counter() - start)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _cold_import_app():
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT.format(heavy=HEAVY_MODULES)],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    seconds, loaded = result.stdout.splitlines()[-2:]
+    return float(seconds), [m for m in loaded.split(",") if m]
+
+
+def test_cold_import_of_app_is_within_budget():
+    budget = float(os.environ.get("STARTUP_IMPORT_BUDGET", STARTUP_IMPORT_BUDGET_SECONDS))
+    seconds, _ = _cold_import_app()
+    assert seconds <= budget, (
+        f"Cold import of app took {seconds:.2f}s (budget {budget:.2f}s). "
+        "Run scripts/profile_imports.py to find the slow imports."
+    )
+
+
+def test_submit_page_does_not_load_heavy_dependencies():
+    _, loaded = _cold_import_app()
+    assert loaded == []
@@ -0,0 +1,87 @@
+import random
+import pandas as pd
+from datetime import date, timedelta
+from utils import stats
+
+
+def _item(user, day, scores, game="Queens", n=0):
+    d = date(2025, 10, 1) + timedelta(days=day)
+    return {
+        "pk": f"g#{user}", "user_id": user, "game_name": game, "scores": scores,
+        "game_date": d.strftime("%d-%m-%Y"), "timestamp": f"{d.isoformat()}T10:00:{n:02d}",
+    }
+
+
+def test_scores_frame_has_one_row_per_metric():
+    frame = stats.scores_frame([_item("Ala", 0, [5, 90], game="Pinpoint")])
+    assert list(frame["metric"]) == ["guesses", "%"]
+    assert list(frame["value"]) == [5.0, 90.0]
+
+
+def test_rolling_window_and_personal_best():
+    items = [_item("Ala", day, [score]) for day, score in [(0, 100), (1, 80), (2, 120), (10, 90)]]
+    frame = stats.compute(stats.scores_frame(items), window_days=7)
+
+    assert list(frame["mean"]) == [100, 90, 100, 90]   # day 10 window holds only itself
+    assert list(frame["median"]) == [100, 90, 100, 90]
+    assert list(frame["best"]) == [100, 80, 80, 80]    # seconds: lower is better
+
+
+def test_higher_is_better_metrics():
+    items = [_item("Ala", day, [3, pct], game="Pinpoint") for day, pct in [(0, 70), (1, 95), (2, 80)]]
+    frame = stats.compute(stats.scores_frame(items))
+    accuracy = frame[frame["metric"] == "%"]
+    assert list(accuracy["best"]) == [70, 95, 95]
+
+
+def test_incremental_update_matches_full_recompute():
+    random.seed(7)
+    items = [
+        _item(random.choice(["Ala", "Ola"]), random.randint(0, 60), [random.randint(1, 300), random.randint(0, 9)],
+              game=random.choice(["Zip", "Queens"]), n=n)
+        for n in range(60)
+    ]
+    engine = stats.StatsEngine()
+    engine.get("g", items[:30], version=1)
+    incremental = engine.get("g", items, version=2)   # includes back-dated scores
+    full = stats.compute(stats.scores_frame(items))
+
+    columns = stats.SERIES + ["game_date", "timestamp", "value"] + stats.STAT_COLUMNS
+    pd.testing.assert_frame_equal(
+        incremental[columns].reset_index(drop=True), full[columns].reset_index(drop=True), check_dtype=False
+    )
+
+
+def test_cached_per_version(monkeypatch):
+    calls = []
+    monkeypatch.setattr(stats, "scores_frame", lambda items: calls.append(len(items)) or pd.DataFrame(
+        columns=["key", "user_id", "game_name", "metric", "game_date", "timestamp", "value"]))
+    engine = stats.StatsEngine()
+    engine.get("g", [], version=1)
+    engine.get("g", [], version=1)
+    assert len(calls) == 1
+
+
+def test_rewritten_item_is_recomputed():
+    items = [_item("Ala", 0, [100]), _item("Ala", 1, [80])]
+    engine = stats.StatsEngine()
+    engine.get("g", items, version=1)
+    rewritten = [items[0], dict(items[1], scores=[120])]   # same key, new score
+    frame = engine.get("g", rewritten, version=2)
+    assert list(frame["value"]) == [100, 120]
+    assert list(frame["best"]) == [100, 100]
+
+
+def test_group_stats_reads_version_before_items(monkeypatch):
+    calls = []
+    monkeypatch.setattr(stats.data, "data_version", lambda table, group_id: calls.append("version") or 1)
+    monkeypatch.setattr(stats.data, "load_history", lambda table, group_id: calls.append("items") or [])
+    monkeypatch.setattr(stats, "_engine", stats.StatsEngine())
+    stats.group_stats("g")
+    assert calls == ["version", "items"]
+
+
+def test_latest_row_per_series():
+    items = [_item("Ala", 0, [100]), _item("Ala", 1, [90]), _item("Ola", 0, [50])]
+    latest = stats.latest(stats.compute(stats.scores_frame(items)))
+    assert sorted(zip(latest["user_id"], latest["value"])) == [("Ala", 90), ("Ola", 50)]
@@ -0,0 +1,163 @@
+import json
+import queue
+from unittest.mock import MagicMock, patch
+from botocore.exceptions import ClientError
+from utils import write_queue
+from utils.write_queue import WriteQueue
+
+
+def _throttle_error():
+    return ClientError(
+        {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": "slow down"}},
+        "PutItem",
+    )
+
+
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_writes_are_flushed_and_journaled(mock_get_table, tmp_path):
+    mock_table = MagicMock(spec=["put_item"])
+    mock_get_table.return_value = mock_table
+    journal = tmp_path / "journal.jsonl"
+
+    on_written = MagicMock()
+    wq = WriteQueue({}, journal_path=str(journal), workers=1, on_written=on_written)
+    item = {"user_id": "Mikuś", "timestamp": "2025-10-03T10:00:00"}
+    write_id = wq.submit("game_scores", item)
+    wq.join()
+    wq.stop()
+
+    mock_table.put_item.assert_called_once_with(Item=item)
+    on_written.assert_called_once_with("game_scores", item)
+    assert wq.status(write_id) is None  # written, and forgotten
+    ops = [json.loads(line)["op"] for line in journal.read_text().splitlines()]
+    assert ops == ["put", "done"]
+
+
+@patch.object(WriteQueue, "_backoff", return_value=0)
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_throttled_batch_is_retried(mock_get_table, mock_backoff, tmp_path):
+    mock_table = MagicMock(spec=["put_item"])
+    mock_table.put_item.side_effect = [_throttle_error(), _throttle_error(), None]
+    mock_get_table.return_value = mock_table
+
+    wq = WriteQueue({}, journal_path=str(tmp_path / "j.jsonl"), workers=1)
+    write_id = wq.submit("game_scores", {"user_id": "Maciuś", "timestamp": "t1"})
+    wq.join()
+    wq.stop()
+
+    assert mock_table.put_item.call_count == 3
+    assert mock_backoff.call_count == 2
+    assert wq.status(write_id) is None  # written, and forgotten
+
+
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_failed_write_is_replayed_after_restart(mock_get_table, tmp_path):
+    journal = str(tmp_path / "j.jsonl")
+    failing = MagicMock(spec=["put_item"])
+    failing.put_item.side_effect = ValueError("boom")
+    mock_get_table.return_value = failing
+
+    wq = WriteQueue({}, journal_path=journal, workers=1)
+    item = {"user_id": "Patryk", "timestamp": "t2"}
+    write_id = wq.submit("raw_game_posts", item)
+    wq.join()
+    wq.stop()
+    assert wq.status(write_id) == "failed"
+
+    healthy = MagicMock(spec=["put_item"])
+    mock_get_table.return_value = healthy
+    restarted = WriteQueue({}, journal_path=journal, workers=1)
+    restarted.join()
+    restarted.stop()
+
+    healthy.put_item.assert_called_once_with(Item=item)
+    assert restarted.status(write_id) is None  # written, and forgotten
+
+
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_failed_write_can_be_retried_in_process(mock_get_table, tmp_path):
+    table = MagicMock(spec=["put_item"])
+    table.put_item.side_effect = [ValueError("boom"), None]
+    mock_get_table.return_value = table
+
+    wq = WriteQueue({}, journal_path=str(tmp_path / "j.jsonl"), workers=1)
+    write_id = wq.submit("raw_game_posts", {"user_id": "Patryk", "timestamp": "t2"})
+    wq.join()
+    assert wq.status(write_id) == "failed"
+    assert wq.error(write_id) == "boom"
+
+    assert wq.retry_failed() == 1
+    wq.join()
+    wq.stop()
+    assert wq.status(write_id) is None  # written, and forgotten
+    assert wq.error(write_id) is None
+    assert wq.retry_failed() == 0
+
+
+def test_backoff_is_capped():
+    wq = WriteQueue.__new__(WriteQueue)
+    wq.base_delay, wq.max_delay = 0.1, 1.0
+    assert all(0 <= wq._backoff(attempt) <= 1.0 for attempt in range(20))
+
+
+@patch("utils.data.aws.get_ddb_table")
+def test_put_falls_back_to_direct_write_when_queue_full(mock_get_table):
+    from utils import data
+
+    mock_table = MagicMock()
+    mock_get_table.return_value = mock_table
+    full_queue = MagicMock()
+    full_queue.submit.side_effect = queue.Full
+
+    item = {"user_id": "Mikuś", "timestamp": "t3"}
+    with patch("utils.data._get_write_queue", return_value=full_queue):
+        data._put("game_scores", item)
+
+    mock_table.put_item.assert_called_once_with(Item=item)
+
+
+def test_is_throttled():
+    assert write_queue.is_throttled(_throttle_error())
+    assert not write_queue.is_throttled(ValueError("nope"))
+
+
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_inaccessible_table_fails_the_write_and_is_not_kept(mock_get_table, tmp_path):
+    table = MagicMock(spec=["put_item"])
+    mock_get_table.side_effect = [None, table]
+
+    wq = WriteQueue({}, journal_path=str(tmp_path / "j.jsonl"), workers=1)
+    write_id = wq.submit("game_scores", {"user_id": "Mikuś", "timestamp": "t4"})
+    wq.join()
+    assert wq.status(write_id) == "failed"
+
+    wq.retry_failed()
+    wq.join()
+    wq.stop()
+    assert wq.status(write_id) is None
+    table.put_item.assert_called_once()
+
+
+@patch("utils.write_queue.aws.get_ddb_table")
+def test_queued_score_is_published_only_once_written(mock_get_table, tmp_path, monkeypatch):
+    from utils import data, feed
+
+    failing = MagicMock(spec=["put_item"])
+    failing.put_item.side_effect = ValueError("boom")
+    mock_get_table.return_value = failing
+    log = feed.LocalLogFeed(str(tmp_path / "feed.jsonl"))
+    wq = WriteQueue({}, journal_path=str(tmp_path / "j.jsonl"), workers=1, on_written=data._remember_write)
+    monkeypatch.setattr(data, "_get_write_queue", lambda: wq)
+    monkeypatch.setattr(data, "_get_feed", lambda: log)
+    monkeypatch.setattr(data, "_get_snapshot_cfg", lambda: (str(tmp_path), 600))
+    monkeypatch.setattr(data.groups, "get_group", lambda group_id: data.groups.default_group())
+
+    data.save_score("Mikuś", "Queens", 1, [90], ["seconds"])
+    wq.join()
+    assert log.read(0)[0] == []
+
+    failing.put_item.side_effect = None
+    wq.retry_failed()
+    wq.join()
+    wq.stop()
+    assert [r["event"] for r in log.read(0)[0]] == ["INSERT"]
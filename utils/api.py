@@ -0,0 +1,230 @@
+import hashlib
+import json
+import threading
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import streamlit as st
+from utils import data, export, groups, snapshot
+
+# Versions are per-process counters, so ETags carry a process tag: a
+# restarted server never answers 304 to an ETag issued by an earlier one.
+_PROCESS_TAG = uuid.uuid4().hex[:8]
+
+_server = None
+_server_lock = threading.Lock()
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _param(params: dict, name: str, default=None):
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _int_param(params: dict, name: str, default=None):
+    value = _param(params, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+
+
+def _since(params: dict):
+    """Earliest date a request can cover ('from', or 'days' back from today), None for all history."""
+    bounds = [_param(params, "from")]
+    days = _int_param(params, "days")
+    if days is not None:
+        bounds.append((date.today() - timedelta(days=days)).isoformat())
+    bounds = [b for b in bounds if b]
+    return max(bounds) if bounds else None
+
+
+def _filters(params: dict, table_name: str, group: dict):
+    """Export-style filters (game, player, from, to) from query parameters."""
+    players = params.get("player")
+    unknown = [p for p in players or [] if p not in group["players"]]
+    if unknown:
+        raise ApiError(400, f"Unknown players {unknown}")
+    game = _param(params, "game")
+    if game is not None and table_name == "game_scores" and game not in group["games"]:
+        raise ApiError(400, f"Invalid game '{game}', must be one of {group['games']}")
+    return {"game": game, "players": players,
+            "date_from": _param(params, "from"), "date_to": _param(params, "to")}
+
+
+def _scores(items: list, params: dict, group: dict):
+    rows = export.filter_items(items, "game_scores", **_filters(params, "game_scores", group))
+    rows.sort(key=lambda i: (i.get("game_date") or "", i.get("timestamp") or ""))
+    return [_row(i, "game_scores") for i in rows]
+
+
+def _posts(items: list, params: dict, group: dict):
+    rows = export.filter_items(items, "raw_game_posts", **_filters(params, "raw_game_posts", group))
+    rows.sort(key=lambda i: i.get("timestamp") or "", reverse=True)
+    limit = _int_param(params, "limit")
+    return [_row(i, "raw_game_posts") for i in rows[:limit]]
+
+
+def _progress(items: list, params: dict, group: dict):
+    """{metric: {player: [[game_date, value], ...]}} for one game, like the Progress charts."""
+    from utils import stats
+
+    filters = _filters(params, "game_scores", group)
+    if filters["game"] is None:
+        raise ApiError(400, "'game' is required")
+    filters["date_from"] = _since(params)
+
+    frame = stats.scores_frame(export.filter_items(items, "game_scores", **filters))
+    frame = frame.sort_values(["game_date", "timestamp"], kind="stable")
+    series = {}
+    for (metric, player), rows in frame.groupby(["metric", "user_id"], sort=False):
+        series.setdefault(metric, {})[player] = [
+            [d.date().isoformat(), v] for d, v in zip(rows["game_date"], rows["value"])
+        ]
+    return series
+
+
+def _leaderboard(items: list, params: dict, group: dict):
+    """Players ranked by their latest rolling mean, per game and metric."""
+    from utils import stats
+
+    filters = _filters(params, "game_scores", group)
+    frame = stats.latest(stats.group_stats(group["group_id"]))
+    if filters["game"] is not None:
+        frame = frame[frame["game_name"] == filters["game"]]
+    if filters["players"] is not None:
+        frame = frame[frame["user_id"].isin(filters["players"])]
+
+    board = {}
+    for (game, metric), rows in frame.groupby(["game_name", "metric"], sort=False):
+        rows = rows.sort_values("mean", ascending=metric in stats.LOWER_IS_BETTER)
+        board.setdefault(game, {})[metric] = [
+            {"rank": rank, "user_id": r.user_id, "mean": r.mean, "median": r.median,
+             "best": r.best, "last": r.value, "game_date": r.game_date.date().isoformat()}
+            for rank, r in enumerate(rows.itertuples(), start=1)
+        ]
+    return board
+
+
+# endpoint -> (table it reads, builder(items, params, group))
+ROUTES = {
+    "scores": ("game_scores", _scores),
+    "progress": ("game_scores", _progress),
+    "leaderboard": ("game_scores", _leaderboard),
+    "posts": ("raw_game_posts", _posts),
+}
+
+
+def _row(item: dict, table_name: str):
+    return {c: snapshot._plain(item.get(c)) for c in export.COLUMNS[table_name]}
+
+
+def etag(endpoint: str, group_id: str, params: dict):
+    """
+    Strong ETag for a response: the data version of what it reads plus the
+    normalized query. `days` windows move with the date, so the start date
+    they resolve to is part of the digest too.
+    """
+    table_name = ROUTES[endpoint][0]
+    query = json.dumps([sorted(params.items()), _since(params)], ensure_ascii=False)
+    digest = hashlib.sha1(f"{endpoint}\0{group_id}\0{query}".encode("utf-8")).hexdigest()[:12]
+    return f'"{_PROCESS_TAG}-{data.data_version(table_name, group_id)}-{digest}"'
+
+
+def _not_modified(if_none_match: str, tag: str):
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or tag in candidates or f"W/{tag}" in candidates
+
+
+def handle(path: str, if_none_match: str = None):
+    """
+    Answer GET `path` ('/groups/<group_id>/<endpoint>?<query>').
+    Returns (status, headers, body bytes).
+
+    Items come from `data.load_history`, the same process-wide cache the app
+    uses, so with a change feed an unchanged group costs no DynamoDB reads,
+    and a matching If-None-Match is answered with 304 before any response
+    is built.
+    """
+    url = urlsplit(path)
+    parts = [p for p in url.path.split("/") if p]
+    try:
+        if parts == ["health"]:
+            return _json(200, {"status": "ok"})
+        if len(parts) != 3 or parts[0] != "groups" or parts[2] not in ROUTES:
+            raise ApiError(404, f"No endpoint at '{url.path}'")
+        _, group_id, endpoint = parts
+        try:
+            group = groups.get_group(group_id)
+        except ValueError as e:
+            raise ApiError(404, str(e))
+
+        params = parse_qs(url.query)
+        table_name, build = ROUTES[endpoint]
+        # A body is tagged with the version read before its items, so it never
+        # claims changes that landed during the load; revalidation compares
+        # against the version after it, which the load brings up to date
+        tag = etag(endpoint, group_id, params)
+        items = data.load_history(table_name, group_id, since=_since(params))
+        current = etag(endpoint, group_id, params)
+        if _not_modified(if_none_match, current):
+            return 304, {"ETag": current, "Cache-Control": "no-cache"}, b""
+        return _json(200, build(items, params, group), {"ETag": tag, "Cache-Control": "no-cache"})
+    except ApiError as e:
+        return _json(e.status, {"error": str(e)})
+    except Exception as e:  # e.g. a failed or throttled query; answer rather than drop the connection
+        return _json(500, {"error": str(e)})
+
+
+def _json(status: int, payload, headers: dict = None):
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    headers = dict(headers or {})
+    headers["Content-Type"] = "application/json; charset=utf-8"
+    return status, headers, body
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status, headers, body = handle(self.path, self.headers.get("If-None-Match"))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # keep the Streamlit console quiet
+
+
+def serve(host: str = "127.0.0.1", port: int = 8502):
+    """Start the API on a background thread and return the server."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="read-api", daemon=True).start()
+    return server
+
+
+def start_from_secrets():
+    """Start the API inside this process once, when `[api] enabled = true`, so it shares the app's caches."""
+    global _server
+    cfg = st.secrets.get("api", {})
+    if not cfg.get("enabled"):
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = serve(cfg.get("host", "127.0.0.1"), cfg.get("port", 8502))
+            except OSError:
+                _server = False  # port taken, e.g. by another app process; don't retry every rerun
+    return _server or None
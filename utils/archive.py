@@ -0,0 +1,158 @@
+import glob
+import os
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from utils import aws, groups, snapshot
+from utils.lru import LRUCache
+
+ARCHIVE_DIR = ".archive"
+TTL_ATTR = "expires_at"
+
+# Memory cap for archive parts kept after their first read
+PARTS_CACHE_BYTES = 128 * 1024 * 1024
+
+
+def _items_size(items: list):
+    """Rough in-memory size of decoded items: their keys and values as text plus per-item overhead."""
+    return sum(200 + sum(len(k) + len(str(v)) for k, v in i.items()) for i in items)
+
+
+# (Parquet part path, mtime) -> items; parts are immutable once written
+_parts_cache = LRUCache(maxsize=4096, max_bytes=PARTS_CACHE_BYTES, sizeof=_items_size)
+
+
+def cutoff(max_age_days: int, now: datetime = None):
+    """ISO timestamp before which items count as cold."""
+    now = now or datetime.now(timezone.utc)
+    return (now - timedelta(days=max_age_days)).isoformat()
+
+
+def _partition_dir(directory: str, table_name: str, group_id: str, month: str):
+    return os.path.join(directory, table_name, f"group_id={group_id}", f"month={month}")
+
+
+def _month(item: dict):
+    return (item.get("timestamp") or "")[:7] or "unknown"
+
+
+def write_partitions(directory: str, table_name: str, group_id: str, items: list):
+    """
+    Append items as zstd-compressed Parquet parts, one per month partition:
+    `<directory>/<table>/group_id=<g>/month=<YYYY-MM>/part-<ms>-<id>.parquet`.
+    Returns the paths written.
+    """
+    import pyarrow.parquet as pq
+
+    by_month = {}
+    for item in items:
+        by_month.setdefault(_month(item), []).append(item)
+
+    paths = []
+    # Several parts can land in one partition within a millisecond
+    stamp = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+    for month, month_items in sorted(by_month.items()):
+        part_dir = _partition_dir(directory, table_name, group_id, month)
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{stamp}.parquet")
+        tmp_path = path + ".tmp"
+        pq.write_table(snapshot.to_arrow(month_items), tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+        paths.append(path)
+    return paths
+
+
+def _read_part(path: str):
+    import pyarrow.parquet as pq
+
+    key = (path, os.path.getmtime(path))
+    items = _parts_cache.get(key)
+    if items is None:
+        # The path's group_id=/month= segments are layout, not columns to infer
+        items = snapshot.from_arrow(pq.read_table(path, partitioning=None))
+        _parts_cache.put(key, items)
+    return items
+
+
+def parts(directory: str, table_name: str, group_id: str, since: str = None):
+    """Archive parts of a group, pruned to month partitions at or after `since` ('YYYY-MM-DD...')."""
+    pattern = os.path.join(directory, table_name, f"group_id={group_id}", "month=*", "*.parquet")
+    paths = sorted(glob.glob(pattern))
+    if since:
+        paths = [p for p in paths if os.path.basename(os.path.dirname(p))[len("month="):] >= since[:7]]
+    return paths
+
+
+def load(directory: str, table_name: str, group_id: str, since: str = None):
+    """
+    Archived items of a group, reading only month partitions from `since` on.
+    Recently read parts are served from memory, up to PARTS_CACHE_BYTES.
+    """
+    items = []
+    for path in parts(directory, table_name, group_id, since):
+        items.extend(_read_part(path))
+    return items
+
+
+def enable_ttl(AWS_CFG, table_name: str):
+    """Turn on DynamoDB TTL on `expires_at` for a table (no-op if it is already on)."""
+    client = aws.get_client(AWS_CFG, "dynamodb")
+    name = aws.physical_name(table_name)
+    status = client.describe_time_to_live(TableName=name)["TimeToLiveDescription"]
+    if status.get("TimeToLiveStatus") in ("ENABLED", "ENABLING"):
+        return
+    client.update_time_to_live(
+        TableName=name,
+        TimeToLiveSpecification={"Enabled": True, "AttributeName": TTL_ATTR},
+    )
+
+
+def run(AWS_CFG, table_name: str, max_age_days: int, directory: str = ARCHIVE_DIR,
+        ttl_days: int = None, group_ids: list = None, dry_run: bool = False, progress=None):
+    """
+    Move items older than `max_age_days` from the hot table to the archive.
+
+    Cold items are found with one key query per player partition
+    (timestamp < cutoff), written to Parquet, and only then removed from
+    the hot table: deleted right away, or with `ttl_days` given, stamped
+    with `expires_at` so DynamoDB TTL removes them after that grace period.
+    Items already stamped are skipped. A run that stops between the two
+    steps archives some items twice, which readers de-duplicate by key.
+
+    `progress(group_id, player, archived)` is called after each player.
+    Returns {"archived": n, "paths": [...], "items": {group_id: [cold items]}}.
+    """
+    from boto3.dynamodb.conditions import Key
+
+    table = aws.get_ddb_table(AWS_CFG, table_name)
+    key_names = aws.KEY_SCHEMA[table_name]
+    before = cutoff(max_age_days)
+    expires_at = int(time.time() + ttl_days * 86400) if ttl_days is not None else None
+
+    result = {"archived": 0, "paths": [], "items": {}}
+    for group in groups.list_groups():
+        group_id = group["group_id"]
+        if group_ids is not None and group_id not in group_ids:
+            continue
+        for player in group["players"]:
+            kwargs = {"KeyConditionExpression": Key("pk").eq(groups.partition_key(group_id, player))
+                      & Key("timestamp").lt(before)}
+            cold = []
+            while True:
+                response = table.query(**kwargs)
+                cold.extend(i for i in response.get("Items", []) if TTL_ATTR not in i)
+                if not response.get("LastEvaluatedKey"):
+                    break
+                kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+            if cold and not dry_run:
+                result["paths"].extend(write_partitions(directory, table_name, group_id, cold))
+                if expires_at is None:
+                    aws.delete_keys(table, [{k: i[k] for k in key_names} for i in cold])
+                else:
+                    aws.put_items(table, [dict(i, **{TTL_ATTR: expires_at}) for i in cold])
+            result["archived"] += len(cold)
+            result["items"].setdefault(group_id, []).extend(cold)
+            if progress:
+                progress(group_id, player, len(cold))
+    return result
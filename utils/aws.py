@@ -1,54 +1,217 @@
-import boto3
+import threading
+import time
+import zlib
 import streamlit as st
 
-def get_ddb_table(AWS_CFG, table_name):
+# Primary key attributes per table (used by MockTable to emulate DynamoDB)
+KEY_SCHEMA = {
+    "game_scores": ("pk", "timestamp"),
+    "raw_game_posts": ("pk", "timestamp"),
+    "groups": ("group_id",),
+}
+DEFAULT_KEY_SCHEMA = ("user_id", "timestamp")
+
+
+def _matches(condition, item):
+    """Evaluate a boto3 Key/Attr condition against a plain item (for MockTable)."""
+    from boto3.dynamodb.conditions import AttributeBase
+
+    if condition is None:
+        return True
+    expr = condition.get_expression()
+    op, values = expr["operator"], expr["values"]
+
+    if op == "AND":
+        return all(_matches(v, item) for v in values)
+    if op == "OR":
+        return any(_matches(v, item) for v in values)
+    if op == "NOT":
+        return not _matches(values[0], item)
+    if op == "attribute_exists":
+        return values[0].name in item
+    if op == "attribute_not_exists":
+        return values[0].name not in item
+
+    resolved = [item.get(v.name) if isinstance(v, AttributeBase) else v for v in values]
+    left = resolved[0]
+    if left is None:
+        return False
+    if op == "=":
+        return left == resolved[1]
+    if op == "<>":
+        return left != resolved[1]
+    if op == "<":
+        return left < resolved[1]
+    if op == "<=":
+        return left <= resolved[1]
+    if op == ">":
+        return left > resolved[1]
+    if op == ">=":
+        return left >= resolved[1]
+    if op == "BETWEEN":
+        return resolved[1] <= left <= resolved[2]
+    if op == "begins_with":
+        return str(left).startswith(resolved[1])
+    if op == "contains":
+        return resolved[1] in left
+    if op == "IN":
+        return left in resolved[1]
+    raise ValueError(f"Unsupported condition operator '{op}'")
+
+
+def put_items(table, items):
+    """Write items with a batch writer when the table has one (boto3), else one by one."""
+    if hasattr(table, "batch_writer"):
+        with table.batch_writer() as writer:
+            for item in items:
+                writer.put_item(Item=item)
+    else:
+        for item in items:
+            table.put_item(Item=item)
+
+
+def delete_keys(table, keys):
+    """Delete items by primary key with a batch writer when the table has one (boto3), else one by one."""
+    if hasattr(table, "batch_writer"):
+        with table.batch_writer() as writer:
+            for key in keys:
+                writer.delete_item(Key=key)
+    else:
+        for key in keys:
+            table.delete_item(Key=key)
+
+
+def get_items(table, keys):
+    """
+    Fetch items by primary key: BatchGetItem in chunks of 100 keys when the
+    table is a boto3 Table (retrying unprocessed keys), else get_item per key.
+    Missing keys are skipped; the order of the result is not defined.
+    """
+    if not hasattr(table, "batch_writer"):
+        return [i for i in (table.get_item(Key=k).get("Item") for k in keys) if i is not None]
+
+    items = []
+    for start in range(0, len(keys), 100):
+        request = {table.name: {"Keys": keys[start:start + 100]}}
+        attempt = 0
+        while request:
+            response = table.meta.client.batch_get_item(RequestItems=request)
+            items.extend(response.get("Responses", {}).get(table.name, []))
+            request = response.get("UnprocessedKeys") or None
+            if request:
+                attempt += 1
+                time.sleep(min(0.05 * 2 ** attempt, 2.0))  # throttled; back off before retrying
+    return items
+
+
+def has_credentials(AWS_CFG):
+    """True if the config holds AWS credentials (otherwise in-memory tables are used)."""
+    return bool(AWS_CFG.get("access_key_id") and AWS_CFG.get("secret_access_key"))
+
+
+def _session_kwargs(AWS_CFG):
+    session_kwargs = {
+        "aws_access_key_id": AWS_CFG.get("access_key_id"),
+        "aws_secret_access_key": AWS_CFG.get("secret_access_key"),
+    }
+    if AWS_CFG.get("region"):
+        session_kwargs["region_name"] = AWS_CFG["region"]
+    return session_kwargs
+
+
+def get_client(AWS_CFG, service_name):
+    """Return a boto3 client (e.g. "dynamodbstreams") for the configured account."""
+    import boto3
+
+    return boto3.Session(**_session_kwargs(AWS_CFG)).client(service_name)
+
+
+def physical_name(table_name):
+    """DynamoDB name of a table; a `[tables]` section in secrets can point it at a re-keyed copy."""
+    return st.secrets.get("tables", {}).get(table_name, table_name)
+
+
+def get_ddb_table(AWS_CFG, table_name, physical=None):
     """
     Returns a DynamoDB Table object or a mock in-memory table if credentials are missing.
     
     Parameters:
     - AWS_CFG: dict with AWS credentials from st.secrets
-    - table_name: str, either "game_scores" or "raw_game_posts"
+    - table_name: str, one of "game_scores", "raw_game_posts" or "groups"
+    - physical: str, DynamoDB table to open instead of the one `[tables]` maps table_name to
     """
-    if AWS_CFG.get("access_key_id") and AWS_CFG.get("secret_access_key"):
-        session_kwargs = {
-            "aws_access_key_id": AWS_CFG.get("access_key_id"),
-            "aws_secret_access_key": AWS_CFG.get("secret_access_key"),
-        }
-        if AWS_CFG.get("region"):
-            session_kwargs["region_name"] = AWS_CFG["region"]
-
+    if has_credentials(AWS_CFG):
+        name = physical or physical_name(table_name)
         try:
-            session = boto3.Session(**session_kwargs)
+            import boto3  # deferred: boto3 is a large share of cold-start import time
+
+            session = boto3.Session(**_session_kwargs(AWS_CFG))
             ddb = session.resource("dynamodb")
-            table = ddb.Table(table_name)
+            table = ddb.Table(name)
             # Check table existence
-            table.meta.client.describe_table(TableName=table_name)
+            table.meta.client.describe_table(TableName=name)
             return table
         except Exception as e:
-            st.error(f"Failed to access table '{table_name}': {str(e)}. Check table name and permissions.")
+            st.error(f"Failed to access table '{name}': {str(e)}. Check table name and permissions.")
             return None
     else:
         st.warning(f"No AWS credentials – using in-memory storage for {table_name} (data lost on restart).")
         
         class MockTable:
-            def __init__(self):
+            def __init__(self, key_schema):
                 self.data = []
+                self.key_schema = key_schema
+                self._lock = threading.Lock()
+
+            def _same_key(self, item, key):
+                return all(item.get(k) == key.get(k) for k in self.key_schema)
 
             def put_item(self, Item):
-                # Remove existing item with same primary key
-                self.data = [
-                    i for i in self.data
-                    if not (i.get('user_id') == Item.get('user_id') and i.get('timestamp') == Item.get('timestamp'))
-                ]
-                self.data.append(Item)
+                # Replace existing item with same primary key in place (keeps scan order)
+                with self._lock:
+                    for idx, i in enumerate(self.data):
+                        if self._same_key(i, Item):
+                            self.data[idx] = Item
+                            return
+                    self.data.append(Item)
 
-            def scan(self):
-                return {"Items": self.data}
+            def get_item(self, Key):
+                for i in self.data:
+                    if self._same_key(i, Key):
+                        return {"Item": i}
+                return {}
 
-            def delete_item(self, Key):
-                self.data = [
+            def _key(self, item):
+                return {k: item.get(k) for k in self.key_schema}
+
+            def scan(self, FilterExpression=None, Segment=None, TotalSegments=None,
+                     ExclusiveStartKey=None, Limit=None, **kwargs):
+                items = self.data
+                if TotalSegments:
+                    items = [
+                        i for i in items
+                        if zlib.crc32(repr(self._key(i)).encode()) % TotalSegments == Segment
+                    ]
+                if ExclusiveStartKey:
+                    keys = [self._key(i) for i in items]
+                    items = items[keys.index(ExclusiveStartKey) + 1:] if ExclusiveStartKey in keys else []
+                response = {}
+                if Limit and len(items) > Limit:
+                    items = items[:Limit]
+                    response["LastEvaluatedKey"] = self._key(items[-1])
+                response["Items"] = [i for i in items if _matches(FilterExpression, i)]
+                return response
+
+            def query(self, KeyConditionExpression, FilterExpression=None, **kwargs):
+                items = [
                     i for i in self.data
-                    if not (i.get('user_id') == Key['user_id'] and i.get('timestamp') == Key['timestamp'])
+                    if _matches(KeyConditionExpression, i) and _matches(FilterExpression, i)
                 ]
+                items.sort(key=lambda i: i.get('timestamp', ''), reverse=not kwargs.get('ScanIndexForward', True))
+                return {"Items": items}
+
+            def delete_item(self, Key):
+                with self._lock:
+                    self.data = [i for i in self.data if not self._same_key(i, Key)]
 
-        return MockTable()
+        return MockTable(KEY_SCHEMA.get(table_name, DEFAULT_KEY_SCHEMA))
@@ -1,8 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
+import os
+import queue
 import random
+import threading
+import time
+import uuid
 import streamlit as st
-from constants import PLAYERS, GAMES, SCORE_UNITS
-from utils import parser, aws
+from constants import DEFAULT_GROUP_ID, GAMES, SCORE_UNITS
+from utils import parser, aws, archive, feed, groups, migrations, search, singleflight, snapshot, write_queue
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+# Process-wide item cache: (table_name, group_id) -> entry (see _new_entry)
+_items_cache = {}
+# Guards _items_cache itself; each entry has its own lock for its contents
+_items_lock = threading.Lock()
+
+# Delta queries re-read this far back from the watermark, so writes that
+# land a little after their timestamp (retries, clock skew) are not missed
+DELTA_OVERLAP = timedelta(minutes=10)
+
+# Bumped whenever a cached (table_name, group_id) entry changes, see _bump_version
+_versions = {}
+_versions_lock = threading.Lock()
+
+# Marks rows written by generate_test_data so they can be purged later
+TEST_BATCH_ATTR = "test_batch"
+
+# group_id -> search.SearchIndex over the group's posts, loaded on first search
+_search_indexes = {}
+_search_lock = threading.Lock()
+
+# Concurrent identical reads from different sessions share one fetch
+_flights = singleflight.SingleFlight()
+
+# (table_name, group_id) -> archive parts last merged by load_history
+_archive_seen = {}
+
+_feed = None
+_subscriber = None
+_feed_lock = threading.Lock()
 
 
 def _get_cfg():
@@ -10,34 +49,517 @@ def _get_cfg():
     return st.secrets.get("aws", {})
 
 
+def write_queue_enabled():
+    """True if saves go through the background write queue (`[write_queue] enabled`)."""
+    return bool(st.secrets.get("write_queue", {}).get("enabled"))
+
+
+def _get_write_queue():
+    """Return the process-wide write queue, or None if it is not enabled in secrets."""
+    global _write_queue
+    if not write_queue_enabled():
+        return None
+    cfg = st.secrets.get("write_queue", {})
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = write_queue.WriteQueue(
+                _get_cfg(),
+                journal_path=cfg.get("journal_path", ".write_journal.jsonl"),
+                maxsize=cfg.get("maxsize", 500),
+                workers=cfg.get("workers", 2),
+                on_written=_remember_write,
+            )
+    return _write_queue
+
+
+def _put(table_name: str, item: dict):
+    """Write an item, through the background queue when enabled, else directly."""
+    wq = _get_write_queue()
+    if wq is not None:
+        try:
+            return wq.submit(table_name, item)
+        except queue.Full:
+            pass  # queue saturated – fall back to a blocking write
+    table = aws.get_ddb_table(_get_cfg(), table_name)
+    table.put_item(Item=item)
+    _remember_write(table_name, item)
+    return None
+
+
+def _publish(table_name: str, event: str, item: dict):
+    """Append a change to the local feed (DynamoDB Streams publishes on its own)."""
+    change_feed = _get_feed()
+    if isinstance(change_feed, feed.LocalLogFeed):
+        change_feed.publish(table_name, event, item)
+
+
+def write_status(table_name: str, item: dict):
+    """Status of a saved item's write: 'queued', 'retrying', 'written' or 'failed'."""
+    wq = _get_write_queue()
+    if wq is None:
+        return "written"
+    return wq.status(write_queue.write_key(table_name, item)) or "written"
+
+
+def write_error(table_name: str, item: dict):
+    """Why a saved item's write failed, or None."""
+    wq = _get_write_queue()
+    return wq.error(write_queue.write_key(table_name, item)) if wq is not None else None
+
+
+def retry_failed_writes():
+    """Re-queue every failed background write. Returns how many were re-queued."""
+    wq = _get_write_queue()
+    return wq.retry_failed() if wq is not None else 0
+
+
+def _paginate(method, **kwargs):
+    """Call a scan/query method until DynamoDB stops returning LastEvaluatedKey."""
+    items = []
+    while True:
+        response = method(**kwargs)
+        items.extend(response.get("Items", []))
+        last_key = response.get("LastEvaluatedKey")
+        if not last_key:
+            return items
+        kwargs["ExclusiveStartKey"] = last_key
+
+
+def _item_key(item: dict):
+    return (item.get("pk"), item.get("timestamp"))
+
+
 def fetch_all(table_name: str):
-    """Fetch all items from a DynamoDB table."""
+    """
+    Fetch all items of every group with a full table scan (admin use only).
+    Concurrent calls for the same table share one scan.
+    """
+    return list(_flights.do(("fetch_all", table_name), _fetch_all, table_name))
+
+
+def _fetch_all(table_name: str):
     AWS_CFG = _get_cfg()
     table = aws.get_ddb_table(AWS_CFG, table_name)  # should return boto3.Table
     try:
-        return table.scan().get("Items", [])
+        return _paginate(table.scan)
     except Exception:
         return []
 
 
-def save_post(user_id: str, raw_post: str):
-    """Save a raw LinkedIn post and its parsed scores."""
-    if user_id not in PLAYERS:
-        raise ValueError(f"Invalid user '{user_id}', must be one of {PLAYERS}")
+def fetch_group(table_name: str, group_id: str = DEFAULT_GROUP_ID, since: str = None):
+    """
+    Fetch a group's items with one key query per player partition,
+    optionally only those with a timestamp at or after `since`.
+    Query errors are raised, not read as an empty group.
+    """
+    from boto3.dynamodb.conditions import Key
 
     AWS_CFG = _get_cfg()
-    posts_table = aws.get_ddb_table(AWS_CFG, "raw_game_posts")
+    table = aws.get_ddb_table(AWS_CFG, table_name)
+    items = []
+    for player in groups.get_group(group_id)["players"]:
+        condition = Key("pk").eq(groups.partition_key(group_id, player))
+        if since is not None:
+            condition = condition & Key("timestamp").gte(since)
+        try:
+            items.extend(_paginate(table.query, KeyConditionExpression=condition))
+        except Exception as e:
+            if (getattr(e, "response", None) or {}).get("Error", {}).get("Code") == "ValidationException":
+                raise RuntimeError(
+                    f"Querying '{table_name}' by pk failed ({e}). Tables created before groups are "
+                    "keyed by user_id; see 'Moving to the pk key' in the README."
+                ) from e
+            raise
+    return items
+
+
+def _get_feed():
+    """
+    Return the process-wide change feed, or None if `[feed]` is not configured.
+    backend = "streams" uses DynamoDB Streams, "local" an append-only log file.
+    """
+    global _feed, _subscriber
+    cfg = st.secrets.get("feed", {})
+    backend = cfg.get("backend")
+    if backend not in ("local", "streams"):
+        return None
+    with _feed_lock:
+        if _feed is None:
+            if backend == "streams":
+                _feed = feed.DynamoStreamFeed(_get_cfg(), ["game_scores", "raw_game_posts"])
+            else:
+                _feed = feed.LocalLogFeed(cfg.get("path", ".change_feed.jsonl"))
+            _subscriber = feed.Subscriber(_feed, _apply_changes, poll_seconds=cfg.get("poll_seconds", 1.0))
+    return _feed
+
+
+def _apply_changes(records: list):
+    """Apply change-feed records to the cached entries they belong to."""
+    for record in records:
+        item = record["item"]
+        cache_key = (record["table"], item.get("group_id"))
+        entry = _get_entry(cache_key)
+        if entry is None:
+            continue  # not loaded in this process; the first load fetches it
+        with entry["lock"]:
+            if record["event"] == feed.REMOVE:
+                _drop_item(entry, item)
+            else:
+                _set_item(entry, item)
+                if item.get("timestamp") and (entry["watermark"] is None or item["timestamp"] > entry["watermark"]):
+                    entry["watermark"] = item["timestamp"]
+            _bump_version(cache_key)
+    _update_search([r for r in records if r["table"] == "raw_game_posts"])
+
+
+def _feed_epoch():
+    """
+    Epoch of the feed subscriber (see feed.Subscriber) while it is healthy,
+    else None. Entries last fetched under another epoch may have missed
+    changes, so they are caught up with a delta query.
+    """
+    if _get_feed() is None or not _subscriber.healthy:
+        return None
+    return _subscriber.epoch
+
+
+def feed_status():
+    """{"backend", "healthy", "errors", "last_error"} of the change feed, or None without one."""
+    if _get_feed() is None:
+        return None
+    return {
+        "backend": type(_feed).__name__,
+        "healthy": _subscriber.healthy,
+        "errors": _subscriber.errors,
+        "last_error": _subscriber.last_error,
+    }
+
+
+def _bump_version(cache_key: tuple):
+    """Mark a cached (table_name, group_id) entry as changed."""
+    with _versions_lock:
+        _versions[cache_key] = _versions.get(cache_key, 0) + 1
+
+
+def data_version(table_name: str, group_id: str = DEFAULT_GROUP_ID):
+    """Counter that changes whenever a group's cached items of a table change."""
+    return _versions.get((table_name, group_id), 0)
+
+
+def refresh_interval():
+    """
+    Seconds between live view refreshes, or None when no change feed is
+    configured. Views re-run on this interval pick up other players'
+    submissions from the cache, without scanning the table.
+    """
+    cfg = st.secrets.get("feed", {})
+    if cfg.get("backend") not in ("local", "streams"):
+        return None
+    return cfg.get("refresh_seconds", 5)
+
+
+def _get_snapshot_cfg():
+    cfg = st.secrets.get("snapshot", {})
+    return cfg.get("directory", ".snapshots"), cfg.get("interval_seconds", 600)
+
+
+def _new_entry(items: list = None, watermark: str = None, snapshot_at: float = 0.0):
+    """
+    A cache entry: items by key, the newest timestamp fetched, when it was
+    last snapshotted, its own lock, the keys changed while a fetch is in
+    flight (None when there is none), whose fetched copies are stale, and
+    the feed epoch of its last fetch.
+    """
+    return {
+        "items": {_item_key(i): i for i in items or []},
+        "watermark": watermark,
+        "snapshot_at": snapshot_at,
+        "lock": threading.Lock(),
+        "changed": None,
+        "feed_epoch": None,
+    }
+
+
+def _get_entry(cache_key: tuple):
+    with _items_lock:
+        return _items_cache.get(cache_key)
+
+
+def _set_item(entry: dict, item: dict):
+    key = _item_key(item)
+    entry["items"][key] = item
+    if entry["changed"] is not None:
+        entry["changed"].add(key)
+
+
+def _drop_item(entry: dict, item: dict):
+    key = _item_key(item)
+    entry["items"].pop(key, None)
+    if entry["changed"] is not None:
+        entry["changed"].add(key)
+
+
+def _delta_since(watermark: str):
+    """Start of a delta query: DELTA_OVERLAP before the watermark."""
+    if watermark is None:
+        return None
+    try:
+        return (datetime.fromisoformat(watermark) - DELTA_OVERLAP).isoformat()
+    except ValueError:
+        return watermark
+
+
+def _remember_write(table_name: str, item: dict):
+    """
+    Note an item that reached DynamoDB: it goes into the group's cached
+    entry, if loaded, and is published to the local feed (or, without a
+    feed, to the search index), so nothing announces a write that may
+    still fail in the queue. An item older than the delta window (test data, a
+    write retried or replayed from the journal) would never be fetched by a
+    delta query, so it also drops the group's snapshots, whose watermark is
+    already past it.
+    """
+    group_id = item.get("group_id")
+    timestamp = item.get("timestamp") or ""
+    entry = _get_entry((table_name, group_id))
+    if entry is None:
+        backdated = timestamp < _delta_since(datetime.now(timezone.utc).isoformat())
+    else:
+        with entry["lock"]:
+            _set_item(entry, item)
+            _bump_version((table_name, group_id))
+            backdated = entry["watermark"] is not None and timestamp < _delta_since(entry["watermark"])
+            if backdated:
+                entry["snapshot_at"] = 0.0  # rewritten, with the item, on the next load
+    if backdated:
+        directory, _ = _get_snapshot_cfg()
+        snapshot.remove(directory, f"{table_name}.{group_id}")
+    _publish(table_name, feed.INSERT, item)
+    if table_name == "raw_game_posts" and _get_feed() is None:
+        _update_search([{"event": feed.INSERT, "item": item}])
+
+
+def load_items(table_name: str, group_id: str = DEFAULT_GROUP_ID):
+    """
+    Return a group's items of a table from the process-wide cache.
+
+    The first call in a process starts from the latest local snapshot, and
+    every call only fetches items from shortly before the newest timestamp
+    seen (see DELTA_OVERLAP), so reads depend on recent activity rather
+    than on total history. Older writes made by this process are put into
+    the cache as they land (see _remember_write).
+    With a change feed the cache is kept current by the feed subscriber
+    and only the first call reads from DynamoDB; while the feed fails, and
+    once after it recovers, calls fall back to delta queries. Sessions loading the same
+    group at the same moment share one fetch.
+    """
+    return list(_flights.do(("load_items", table_name, group_id), _load_items, table_name, group_id))
+
+
+def coalescing_info():
+    """Counters of the single-flight layer shared by fetch_all and load_items."""
+    return _flights.info()
+
+
+def _load_items(table_name: str, group_id: str):
+    directory, interval = _get_snapshot_cfg()
+    cache_key = (table_name, group_id)
+    snapshot_name = f"{table_name}.{group_id}"
+    # Subscribe before the first fetch so no change falls between the two
+    epoch = _feed_epoch()
+    entry = _get_entry(cache_key)
+    if entry is not None and epoch is not None and entry["feed_epoch"] == epoch:
+        with entry["lock"]:
+            return list(entry["items"].values())
+    if entry is None:
+        items, watermark = snapshot.load_latest(directory, snapshot_name)
+        loaded = _new_entry(items, watermark, time.time() if items is not None else 0.0)
+        with _items_lock:
+            entry = _items_cache.setdefault(cache_key, loaded)
+        if entry is loaded:
+            _bump_version(cache_key)
+
+    # Query without holding the lock; changes applied meanwhile win over the fetched copies
+    with entry["lock"]:
+        since = _delta_since(entry["watermark"])
+        entry["changed"] = set()
+    try:
+        fetched = fetch_group(table_name, group_id, since=since)
+    finally:
+        with entry["lock"]:
+            changed, entry["changed"] = entry["changed"], None
+
+    with entry["lock"]:
+        entry["feed_epoch"] = epoch
+        for item in fetched:
+            key = _item_key(item)
+            if key in changed:
+                continue
+            if entry["items"].get(key) != item:
+                _bump_version(cache_key)
+            entry["items"][key] = item
+            if item.get("timestamp") and (entry["watermark"] is None or item["timestamp"] > entry["watermark"]):
+                entry["watermark"] = item["timestamp"]
+        items = list(entry["items"].values())
+        due = bool(items) and time.time() - entry["snapshot_at"] >= interval
+        if due:
+            entry["snapshot_at"] = time.time()
+            watermark = entry["watermark"]
+
+    if due:
+        try:
+            snapshot.write_snapshot(directory, snapshot_name, items, watermark)
+        except Exception:
+            pass  # snapshots only speed up cold starts
+        with entry["lock"]:
+            stale = entry["snapshot_at"] == 0.0
+        if stale:  # a back-dated write dropped snapshots while this one was written
+            snapshot.remove(directory, snapshot_name)
+    return items
+
+
+def _get_search_index(group_id: str):
+    """
+    The group's post search index. The first call in a process loads the
+    persisted index and catches up with posts saved since it was written
+    (building it from scratch with one query per player if there is none).
+    """
+    with _search_lock:
+        index = _search_indexes.get(group_id)
+        if index is None:
+            directory = st.secrets.get("search", {}).get("directory", search.INDEX_DIR)
+            index = search.SearchIndex.load(os.path.join(directory, f"raw_game_posts.{group_id}.json"))
+            fetched = fetch_group("raw_game_posts", group_id, since=_delta_since(index.watermark))
+            for item in fetched:
+                index.add(item)
+            if fetched:
+                index.save_soon()
+            _search_indexes[group_id] = index
+    return index
+
+
+def _update_search(records: list):
+    """
+    Apply post change records ({"event", "item"}) to the search indexes
+    loaded in this process. With a change feed every change arrives through
+    it, so writers only call this when there is none.
+    """
+    touched = set()
+    for record in records:
+        item = record["item"]
+        index = _search_indexes.get(item.get("group_id"))
+        if index is None:
+            continue  # caught up on first search
+        if record["event"] == feed.REMOVE:
+            index.remove(_item_key(item))
+        else:
+            index.add(item)
+        touched.add(index)
+    for index in touched:
+        index.save_soon()
+
+
+def get_posts(group_id: str, keys: list):
+    """
+    Posts by (pk, timestamp) key, in the order of `keys`. Served from the
+    item cache when the group's posts are loaded, the rest with a batch get.
+    """
+    entry = _get_entry(("raw_game_posts", group_id))
+    found = {}
+    if entry is not None:
+        with entry["lock"]:
+            found = {k: entry["items"][k] for k in keys if k in entry["items"]}
+    missing = [k for k in keys if k not in found]
+    if missing:
+        table = aws.get_ddb_table(_get_cfg(), "raw_game_posts")
+        for item in aws.get_items(table, [{"pk": pk, "timestamp": ts} for pk, ts in missing]):
+            found[_item_key(item)] = item
+    return [found[k] for k in keys if k in found]
+
+
+def search_posts(query: str, group_id: str = DEFAULT_GROUP_ID, limit: int = 50):
+    """
+    A group's posts matching `query` (words of the post, game, number or
+    player), best match first. Only the matching posts are read.
+    """
+    hits = _get_search_index(group_id).search(query, limit=limit)
+    return get_posts(group_id, [key for key, _ in hits])
+
+
+def _get_archive_cfg():
+    cfg = st.secrets.get("archive", {})
+    return cfg.get("directory", archive.ARCHIVE_DIR), cfg.get("max_age_days")
+
+
+def load_history(table_name: str, group_id: str = DEFAULT_GROUP_ID, since: str = None):
+    """
+    A group's hot items plus archived ones, for ranges starting at `since`
+    ('YYYY-MM-DD', None for all history).
+
+    Ranges that stay within the retention age never touch the archive;
+    longer ones read only the month partitions they cover. Hot items win
+    over archived copies of the same key.
+    """
+    items = load_items(table_name, group_id)
+    directory, max_age_days = _get_archive_cfg()
+    if since is not None and max_age_days is not None and since >= archive.cutoff(max_age_days)[:10]:
+        return items
+
+    cache_key = (table_name, group_id)
+    signature = tuple(archive.parts(directory, table_name, group_id))
+    with _items_lock:
+        if _archive_seen.get(cache_key, ()) != signature:
+            _archive_seen[cache_key] = signature
+            _bump_version(cache_key)
+    if not signature:
+        return items
+
+    merged = {_item_key(i): i for i in archive.load(directory, table_name, group_id, since)}
+    merged.update((_item_key(i), i) for i in items)
+    return list(merged.values())
+
+
+def forget(table_name: str, group_id: str, items: list):
+    """
+    Drop items that left the hot table (e.g. were archived) from the cache,
+    the local change feed, the search index and the group's snapshots.
+    """
+    directory, _ = _get_snapshot_cfg()
+    cache_key = (table_name, group_id)
+    entry = _get_entry(cache_key)
+    if entry is not None:
+        with entry["lock"]:
+            for item in items:
+                _drop_item(entry, item)
+            _bump_version(cache_key)
+    for item in items:
+        _publish(table_name, feed.REMOVE, item)
+    if table_name == "raw_game_posts" and _get_feed() is None:
+        _update_search([{"event": feed.REMOVE, "item": dict(i, group_id=group_id)} for i in items])
+    snapshot.remove(directory, f"{table_name}.{group_id}")
+
+
+def save_post(user_id: str, raw_post: str, group_id: str = DEFAULT_GROUP_ID, parsed: dict = None):
+    """
+    Save a raw LinkedIn post and its parsed scores.
+    Pass `parsed` when the post was already parsed (e.g. for the preview) to skip parsing it again.
+    """
+    groups.validate_player(group_id, user_id)
 
     timestamp = datetime.now(timezone.utc).isoformat()
     post_item = {
+        "pk": groups.partition_key(group_id, user_id),
+        "group_id": group_id,
         "user_id": user_id,
         "raw_post": raw_post,
         "timestamp": timestamp,
+        "schema_version": migrations.latest_version("raw_game_posts"),
     }
-    posts_table.put_item(Item=post_item)
+    _put("raw_game_posts", post_item)
 
     try:
-        parsed = parser.parse_post(raw_post)
+        if parsed is None:
+            parsed = parser.parse_post_cached(raw_post)
         game_name = parsed["game_name"]
         if game_name in GAMES:
             units = SCORE_UNITS.get(game_name, ["points"])
@@ -48,6 +570,7 @@ def save_post(user_id: str, raw_post: str):
                 scores=parsed["scores"],
                 units=units,
                 timestamp=timestamp,
+                group_id=group_id,
             )
     except Exception:
         pass
@@ -56,42 +579,43 @@ def save_post(user_id: str, raw_post: str):
 
 
 def save_score(user_id: str, game_name: str, game_number: int, scores: list, units: list,
-               game_date: str = None, timestamp: str = None):
+               game_date: str = None, timestamp: str = None, group_id: str = DEFAULT_GROUP_ID):
     """Save a processed game score into 'game_scores'."""
-    if user_id not in PLAYERS:
-        raise ValueError(f"Invalid user '{user_id}', must be one of {PLAYERS}")
+    groups.validate_player(group_id, user_id)
     if game_name not in GAMES:
         raise ValueError(f"Invalid game '{game_name}', must be one of {GAMES}")
 
-    AWS_CFG = _get_cfg()
-    scores_table = aws.get_ddb_table(AWS_CFG, "game_scores")
-
     if timestamp is None:
         timestamp = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
     if game_date is None:
-        game_date = datetime.now(timezone.utc).strftime("%d-%m-%Y")
+        game_date = datetime.now(timezone.utc).date().isoformat()
 
     item = {
+        "pk": groups.partition_key(group_id, user_id),
+        "group_id": group_id,
         "user_id": user_id,
         "timestamp": timestamp,
         "game_name": game_name,
         "game_number": game_number,
         "scores": scores,
         "units": units,
-        "game_date": game_date,
+        "game_date": migrations.iso_date(game_date),
+        "schema_version": migrations.latest_version("game_scores"),
     }
-    scores_table.put_item(Item=item)
+    _put("game_scores", item)
     return item
 
 
 def generate_test_data(user: str, game: str = "Pinpoint",
-                       start_date: datetime = None, end_date: datetime = None):
+                       start_date: datetime = None, end_date: datetime = None,
+                       group_id: str = DEFAULT_GROUP_ID, batch_id: str = None):
     """
     Generate test data entries for one game for a single user into 'game_scores'.
-    Each day in the date range becomes an entry.
+    Each day in the date range becomes an entry, tagged with `batch_id`
+    (a new one unless given) so `purge_test_data` can remove it.
+    Returns the batch id.
     """
-    if user not in PLAYERS:
-        raise ValueError(f"Invalid user '{user}', must be one of {PLAYERS}")
+    groups.validate_player(group_id, user)
     if game not in GAMES:
         raise ValueError(f"Invalid game '{game}', must be one of {GAMES}")
 
@@ -99,6 +623,8 @@ def generate_test_data(user: str, game: str = "Pinpoint",
         start_date = datetime.now().date()
     if end_date is None:
         end_date = start_date
+    if batch_id is None:
+        batch_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
 
     AWS_CFG = _get_cfg()
     scores_table = aws.get_ddb_table(AWS_CFG, "game_scores")
@@ -106,7 +632,7 @@ def generate_test_data(user: str, game: str = "Pinpoint",
     current_date = start_date
     while current_date <= end_date:
         game_number = int(current_date.strftime("%d%m%Y"))
-        game_date_str = current_date.strftime("%d-%m-%Y")
+        game_date_str = current_date.isoformat()
 
         scores, units = [], []
 
@@ -131,6 +657,8 @@ def generate_test_data(user: str, game: str = "Pinpoint",
 
         timestamp = datetime.combine(current_date, datetime.min.time()).replace(microsecond=0).isoformat()
         item = {
+            "pk": groups.partition_key(group_id, user),
+            "group_id": group_id,
             "user_id": user,
             "timestamp": timestamp,
             "game_name": game,
@@ -138,9 +666,99 @@ def generate_test_data(user: str, game: str = "Pinpoint",
             "scores": scores,
             "units": units,
             "game_date": game_date_str,
+            "schema_version": migrations.latest_version("game_scores"),
+            TEST_BATCH_ATTR: batch_id,
         }
         scores_table.put_item(Item=item)
+        _remember_write("game_scores", item)
 
         current_date += timedelta(days=1)
 
-    return True
+    return batch_id
+
+
+def list_test_batches(group_id: str = DEFAULT_GROUP_ID):
+    """
+    {batch_id: item count} of the generated test data in a group's scores,
+    counted from the item cache: generated rows go into it as they are
+    written and purged ones are dropped from it, so reruns read nothing.
+    """
+    counts = {}
+    for item in load_items("game_scores", group_id):
+        if item.get(TEST_BATCH_ATTR):
+            counts[item[TEST_BATCH_ATTR]] = counts.get(item[TEST_BATCH_ATTR], 0) + 1
+    return dict(sorted(counts.items()))
+
+
+def _find_test_data(table_name: str, condition, group_id: str = None, segments: int = 4):
+    """Tagged items of one group (key queries) or of all groups (parallel segmented scan)."""
+    AWS_CFG = _get_cfg()
+    if group_id is not None:
+        from boto3.dynamodb.conditions import Key
+
+        table = aws.get_ddb_table(AWS_CFG, table_name)
+        items = []
+        for player in groups.get_group(group_id)["players"]:
+            items.extend(_paginate(
+                table.query,
+                KeyConditionExpression=Key("pk").eq(groups.partition_key(group_id, player)),
+                FilterExpression=condition,
+            ))
+        return items
+
+    def scan_segment(segment: int):
+        table = aws.get_ddb_table(AWS_CFG, table_name)  # one resource per thread
+        return _paginate(table.scan, FilterExpression=condition, Segment=segment, TotalSegments=segments)
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        return [i for page in pool.map(scan_segment, range(segments)) for i in page]
+
+
+def purge_test_data(batch_id: str = None, group_id: str = None, table_name: str = "game_scores",
+                    segments: int = 4, workers: int = 4, chunk_size: int = 25, progress=None):
+    """
+    Delete generated test data: one batch, or every batch when `batch_id` is None.
+
+    Tagged items are found with key queries when `group_id` is given, else
+    with a parallel scan of `segments` segments. They are deleted in chunks
+    of `chunk_size` keys by `workers` threads, each with its own batch
+    writer, then evicted from the caches, snapshots and local change feed.
+
+    `progress(deleted, total)` is called on the calling thread after each chunk.
+    Returns {"found": n, "deleted": n, "batches": [batch ids]}.
+    """
+    from boto3.dynamodb.conditions import Attr
+
+    condition = Attr(TEST_BATCH_ATTR).exists() if batch_id is None else Attr(TEST_BATCH_ATTR).eq(batch_id)
+    items = _find_test_data(table_name, condition, group_id, segments)
+
+    AWS_CFG = _get_cfg()
+    key_names = aws.KEY_SCHEMA[table_name]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    local = threading.local()
+
+    def delete_chunk(chunk: list):
+        if not hasattr(local, "table"):
+            local.table = aws.get_ddb_table(AWS_CFG, table_name)  # one resource per worker thread
+        aws.delete_keys(local.table, [{k: i[k] for k in key_names} for i in chunk])
+        return len(chunk)
+
+    deleted = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Progress is reported from the calling thread, so UI callbacks work
+        for future in as_completed([pool.submit(delete_chunk, c) for c in chunks]):
+            deleted += future.result()
+            if progress:
+                progress(deleted, len(items))
+
+    by_group = {}
+    for item in items:
+        by_group.setdefault(item.get("group_id", DEFAULT_GROUP_ID), []).append(item)
+    for purged_group, purged in by_group.items():
+        forget(table_name, purged_group, purged)
+
+    return {
+        "found": len(items),
+        "deleted": deleted,
+        "batches": sorted({i[TEST_BATCH_ATTR] for i in items}),
+    }
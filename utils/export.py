@@ -0,0 +1,195 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import datetime
+import streamlit as st
+from constants import DEFAULT_GROUP_ID
+from utils import aws, groups, migrations, snapshot
+
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Appended to a 'YYYY-MM-DD' bound so it sorts after every timestamp of that day
+END_OF_DAY = "\uffff"
+
+COLUMNS = {
+    "game_scores": ["group_id", "user_id", "game_name", "game_number", "scores", "units",
+                    "game_date", "timestamp"],
+    "raw_game_posts": ["group_id", "user_id", "raw_post", "timestamp"],
+}
+
+
+def _schema(table_name: str):
+    import pyarrow as pa
+
+    types = {
+        "game_number": pa.int64(),
+        "scores": pa.list_(pa.float64()),
+        "units": pa.list_(pa.string()),
+    }
+    return pa.schema([(c, types.get(c, pa.string())) for c in COLUMNS[table_name]])
+
+
+def _matches(item: dict, table_name: str, game: str = None, players: list = None,
+             date_from: str = None, date_to: str = None):
+    if game and table_name == "game_scores" and item.get("game_name") != game:
+        return False
+    if players is not None and item.get("user_id") not in players:
+        return False
+    date = _date_of(item, table_name)
+    if date_from and (date is None or date < date_from):
+        return False
+    if date_to and (date is None or date > date_to):
+        return False
+    return True
+
+
+def _date_of(item: dict, table_name: str):
+    """'YYYY-MM-DD' the date filters compare against: game_date for scores, submission day for posts."""
+    if table_name == "game_scores":
+        return migrations.iso_date(item.get("game_date"))
+    return (item.get("timestamp") or "")[:10] or None
+
+
+def filter_items(items: list, table_name: str, **filters):
+    """Apply the export filters to already loaded items."""
+    return [i for i in items if _matches(i, table_name, **filters)]
+
+
+def chunked(items: list, size: int = 500):
+    """Split loaded items into pages, so they go through the same writers as queried pages."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def iter_pages(AWS_CFG, table_name: str, group_id: str = DEFAULT_GROUP_ID, game: str = None,
+               players: list = None, date_from: str = None, date_to: str = None, page_size: int = 500):
+    """
+    Yield filtered items page by page straight from DynamoDB: one paginated
+    key query per player, with game and game-date filters pushed down as a
+    FilterExpression. Posts are bounded on the timestamp sort key instead.
+    Memory use is one page, however large the table is.
+
+    Rows not migrated yet (no schema version) may still hold 'DD-MM-YYYY'
+    dates, which don't compare as strings, so the date filter lets them
+    through and every page is filtered again like filter_items does.
+    """
+    from boto3.dynamodb.conditions import Key, Attr
+
+    table = aws.get_ddb_table(AWS_CFG, table_name)
+    for player in players or groups.get_group(group_id)["players"]:
+        condition = Key("pk").eq(groups.partition_key(group_id, player))
+        kwargs = {"Limit": page_size}
+        filters = []
+        if table_name == "game_scores":
+            if game:
+                filters.append(Attr("game_name").eq(game))
+            dates = []
+            if date_from:
+                dates.append(Attr("game_date").gte(date_from))
+            if date_to:
+                dates.append(Attr("game_date").lte(date_to))
+            if dates:
+                in_range = dates[0] if len(dates) == 1 else dates[0] & dates[1]
+                filters.append(in_range | Attr(migrations.VERSION_ATTR).not_exists())
+        else:
+            if date_from and date_to:
+                condition = condition & Key("timestamp").between(date_from, date_to + END_OF_DAY)
+            elif date_from:
+                condition = condition & Key("timestamp").gte(date_from)
+            elif date_to:
+                condition = condition & Key("timestamp").lte(date_to + END_OF_DAY)
+        kwargs["KeyConditionExpression"] = condition
+        if filters:
+            expression = filters[0]
+            for f in filters[1:]:
+                expression = expression & f
+            kwargs["FilterExpression"] = expression
+
+        while True:
+            response = table.query(**kwargs)
+            page = [i for i in response.get("Items", [])
+                    if _matches(i, table_name, game, players, date_from, date_to)]
+            if page:
+                yield page
+            if not response.get("LastEvaluatedKey"):
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+
+def _row(item: dict, columns: list):
+    return {c: snapshot._plain(item.get(c)) for c in columns}
+
+
+def write(pages, table_name: str, fmt: str, out):
+    """
+    Stream pages of items to the binary file object `out` as csv, jsonl or parquet.
+    Returns the number of rows written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format '{fmt}', must be one of {list(FORMATS)}")
+    columns = COLUMNS[table_name]
+    rows = 0
+
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = _schema(table_name)
+        with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+            for page in pages:
+                writer.write_table(pa.Table.from_pylist([_row(i, columns) for i in page], schema=schema))
+                rows += len(page)
+        return rows
+
+    text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(text, fieldnames=columns)
+            writer.writeheader()
+        for page in pages:
+            for item in page:
+                row = _row(item, columns)
+                if fmt == "csv":
+                    writer.writerow({k: json.dumps(v) if isinstance(v, list) else v for k, v in row.items()})
+                else:
+                    text.write(json.dumps(row, ensure_ascii=False) + "\n")
+            rows += len(page)
+        text.flush()
+    finally:
+        text.detach()  # leave `out` open for the caller
+    return rows
+
+
+def date_bounds(date_range):
+    """(date_from, date_to) as 'YYYY-MM-DD' (or None) from an st.date_input range value."""
+    bounds = [d.isoformat() for d in date_range or ()]
+    if not bounds:
+        return None, None
+    return bounds[0], bounds[-1]
+
+
+def download_controls(table_name: str, items: list, key: str):
+    """Format picker plus download button for items that are already loaded and filtered."""
+    col1, col2 = st.columns([1, 3])
+    fmt = col1.selectbox("Export format", list(FORMATS), key=f"{key}_export_format",
+                         label_visibility="collapsed")
+    if not col2.button(f"Prepare {fmt.upper()} export ({len(items)} rows)", key=f"{key}_export_prepare"):
+        return
+
+    # Spooled: stays in memory for small exports, moves to disk for large ones
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as out:
+        write(chunked(items), table_name, fmt, out)
+        out.seek(0)
+        st.download_button(
+            f"Download {fmt.upper()}",
+            data=out.read(),
+            file_name=f"{table_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}",
+            mime=FORMATS[fmt],
+            key=f"{key}_export_download",
+            on_click="ignore",
+        )
@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+from utils import aws
+
+INSERT, MODIFY, REMOVE = "INSERT", "MODIFY", "REMOVE"
+
+# How long a stream's shard list is reused before describe_stream is called again
+SHARD_REFRESH_SECONDS = 60
+
+# Longest wait between polls while reads keep failing
+MAX_BACKOFF_SECONDS = 30
+
+
+def _error_code(error: Exception):
+    return (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+
+
+class LocalLogFeed:
+    """
+    Append-only JSONL change log; the stand-in for DynamoDB Streams in tests
+    and when running without AWS. Positions are byte offsets into the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lost = 0
+        self._lock = threading.Lock()
+
+    def publish(self, table_name: str, event: str, item: dict):
+        record = {"table": table_name, "event": event, "item": item}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    def latest_position(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def read(self, position=None):
+        """Return (records after `position`, new position)."""
+        position = position or 0
+        if not os.path.exists(self.path):
+            return [], position
+        if position > os.path.getsize(self.path):
+            self.lost += 1  # the log was truncated or replaced
+            position = 0
+
+        records = []
+        with open(self.path, "rb") as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # record still being written
+                position += len(line)
+                records.append(json.loads(line))
+        return records, position
+
+
+class DynamoStreamFeed:
+    """
+    Change feed backed by DynamoDB Streams (NEW_AND_OLD_IMAGES) of the given tables.
+    Positions map shard ids to their next shard iterator.
+
+    Shard lists are cached for SHARD_REFRESH_SECONDS (and refreshed when a
+    shard closes). An expired iterator is re-acquired after the last record
+    read from its shard; when records are gone (trimmed, or an iterator
+    expired before anything was read) reading restarts from the oldest
+    available record and `lost` is incremented, so consumers can catch up
+    another way.
+    """
+
+    def __init__(self, AWS_CFG, table_names: list):
+        from boto3.dynamodb.types import TypeDeserializer
+
+        self._deserializer = TypeDeserializer()
+        self.client = aws.get_client(AWS_CFG, "dynamodbstreams")
+        ddb = aws.get_client(AWS_CFG, "dynamodb")
+        self.streams = {
+            name: ddb.describe_table(TableName=aws.physical_name(name))["Table"]["LatestStreamArn"]
+            for name in table_names
+        }
+        self._closed = set()
+        self._sequences = {}  # shard id -> sequence number of the last record read
+        self._shard_cache = {}  # stream arn -> (fetched_at, shards)
+        self.lost = 0
+
+    def latest_position(self):
+        position = {}
+        for arn in self.streams.values():
+            for shard in self._shards(arn):
+                position[shard["ShardId"]] = self._iterator(arn, shard["ShardId"], "LATEST")
+        return position
+
+    def read(self, position=None):
+        """Return (records after `position`, new position)."""
+        position = dict(position or {})
+        records = []
+        for table_name, arn in self.streams.items():
+            for shard in self._shards(arn):
+                shard_id = shard["ShardId"]
+                if shard_id in self._closed:
+                    continue
+                # Shards that appeared since the last read are read from their start
+                iterator = position.get(shard_id) or self._iterator(arn, shard_id, "TRIM_HORIZON")
+                response = self._get_records(arn, shard_id, iterator)
+                for r in response.get("Records", []):
+                    records.append(self._convert(table_name, r))
+                    self._sequences[shard_id] = r["dynamodb"].get("SequenceNumber")
+                if response.get("NextShardIterator"):
+                    position[shard_id] = response["NextShardIterator"]
+                else:
+                    self._closed.add(shard_id)
+                    position.pop(shard_id, None)
+                    self._shard_cache.pop(arn, None)  # its child shards are new
+        return records, position
+
+    def _get_records(self, arn: str, shard_id: str, iterator: str):
+        """get_records, re-acquiring the shard's iterator once if it expired or points at trimmed records."""
+        try:
+            return self.client.get_records(ShardIterator=iterator)
+        except Exception as e:
+            if _error_code(e) not in ("ExpiredIteratorException", "TrimmedDataAccessException"):
+                raise  # e.g. LimitExceededException: the subscriber backs off and retries
+            return self.client.get_records(ShardIterator=self._resume(arn, shard_id, _error_code(e)))
+
+    def _resume(self, arn: str, shard_id: str, code: str):
+        sequence = self._sequences.get(shard_id)
+        if code == "ExpiredIteratorException" and sequence:
+            try:
+                return self.client.get_shard_iterator(
+                    StreamArn=arn, ShardId=shard_id, ShardIteratorType="AFTER_SEQUENCE_NUMBER",
+                    SequenceNumber=sequence,
+                )["ShardIterator"]
+            except Exception as e:
+                if _error_code(e) != "TrimmedDataAccessException":
+                    raise
+        self.lost += 1
+        return self._iterator(arn, shard_id, "TRIM_HORIZON")
+
+    def _shards(self, arn: str):
+        cached = self._shard_cache.get(arn)
+        if cached and time.time() - cached[0] < SHARD_REFRESH_SECONDS:
+            return cached[1]
+        shards = self.client.describe_stream(StreamArn=arn)["StreamDescription"]["Shards"]
+        self._shard_cache[arn] = (time.time(), shards)
+        return shards
+
+    def _iterator(self, arn: str, shard_id: str, iterator_type: str):
+        return self.client.get_shard_iterator(
+            StreamArn=arn, ShardId=shard_id, ShardIteratorType=iterator_type
+        )["ShardIterator"]
+
+    def _convert(self, table_name: str, record: dict):
+        change = record["dynamodb"]
+        image = change.get("NewImage") or change.get("OldImage") or change.get("Keys", {})
+        item = {k: self._deserializer.deserialize(v) for k, v in image.items()}
+        return {"table": table_name, "event": record["eventName"], "item": item}
+
+
+class Subscriber:
+    """
+    Background thread that polls a feed and hands new records to `apply`.
+
+    `healthy` is False while polls fail (polling then backs off up to
+    MAX_BACKOFF_SECONDS) and `last_error` says why. `epoch` changes after
+    every failed poll and every loss reported by the feed, i.e. whenever
+    `apply` may have missed records.
+    """
+
+    def __init__(self, feed, apply, poll_seconds: float = 1.0):
+        self.feed = feed
+        self.apply = apply
+        self.poll_seconds = poll_seconds
+        self.healthy = True
+        self.errors = 0
+        self.last_error = None
+        self.position = feed.latest_position()
+        self._poll_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="change-feed", daemon=True)
+        self._thread.start()
+
+    def poll(self):
+        """Read and apply pending records once. Returns how many were applied."""
+        with self._poll_lock:
+            try:
+                records, position = self.feed.read(self.position)
+                if records:
+                    self.apply(records)
+                self.position = position  # only past records that were applied
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                self.healthy = False
+                raise
+            self.healthy = True
+        return len(records)
+
+    @property
+    def epoch(self):
+        return self.errors + self.feed.lost
+
+    def _run(self):
+        failing = 0
+        while not self._stop.wait(min(self.poll_seconds * 2 ** failing, MAX_BACKOFF_SECONDS)):
+            try:
+                self.poll()
+                failing = 0
+            except Exception:
+                failing = min(failing + 1, 10)  # marked unhealthy by poll; retried with backoff
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
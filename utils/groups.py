@@ -0,0 +1,132 @@
+import re
+import threading
+import time
+import streamlit as st
+from constants import DEFAULT_GROUP_ID, PLAYERS, GAMES, COLORS, PALETTE
+from utils import aws
+
+GROUPS_TABLE = "groups"
+CACHE_TTL_SECONDS = 300
+
+# group_id -> (loaded_at, group); "*" holds the full list
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _get_cfg():
+    """Return AWS config from Streamlit secrets."""
+    return st.secrets.get("aws", {})
+
+
+def partition_key(group_id: str, user_id: str):
+    """Partition key of a player's items: '<group_id>#<user_id>'."""
+    return f"{group_id}#{user_id}"
+
+
+def default_group():
+    """The original group, defined by constants.py."""
+    return {
+        "group_id": DEFAULT_GROUP_ID,
+        "name": "LinkedInowe Wariaty",
+        "players": list(PLAYERS),
+        "games": list(GAMES),
+        "colors": dict(COLORS),
+    }
+
+
+def _with_defaults(group: dict):
+    """Fill optional fields and give every player a color."""
+    group = dict(group)
+    group["players"] = list(group.get("players", []))
+    group["games"] = [g for g in group.get("games") or GAMES if g in GAMES]
+    colors = dict(group.get("colors") or {})
+    for idx, player in enumerate(group["players"]):
+        colors.setdefault(player, PALETTE[idx % len(PALETTE)])
+    group["colors"] = colors
+    return group
+
+
+def _registry():
+    table = aws.get_ddb_table(_get_cfg(), GROUPS_TABLE)
+    if table is None:
+        raise RuntimeError(f"Group registry table '{GROUPS_TABLE}' is not accessible")
+    return table
+
+
+def _cached(key, loader):
+    """Cached `loader()` result; errors it raises propagate and are not cached."""
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and time.time() - hit[0] < CACHE_TTL_SECONDS:
+            return hit[1]
+    value = loader()
+    with _cache_lock:
+        _cache[key] = (time.time(), value)
+    return value
+
+
+def invalidate():
+    """Drop cached registry lookups."""
+    with _cache_lock:
+        _cache.clear()
+
+
+def get_group(group_id: str = DEFAULT_GROUP_ID):
+    """
+    Return a group's registry entry (cached). Raises ValueError for unknown
+    groups; registry errors (e.g. throttling) are raised as they are.
+    """
+    def load():
+        item = _registry().get_item(Key={"group_id": group_id}).get("Item")
+        if item is None and group_id == DEFAULT_GROUP_ID:
+            item = default_group()
+        return _with_defaults(item) if item else None
+
+    group = _cached(group_id, load)
+    if group is None:
+        raise ValueError(f"Unknown group '{group_id}'")
+    return group
+
+
+def list_groups():
+    """Return all registered groups (cached), always including the default one."""
+    def load():
+        table = _registry()
+        items, kwargs = [], {}
+        while True:
+            response = table.scan(**kwargs)
+            items.extend(response.get("Items", []))
+            if not response.get("LastEvaluatedKey"):
+                break
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+        if not any(i.get("group_id") == DEFAULT_GROUP_ID for i in items):
+            items.insert(0, default_group())
+        return [_with_defaults(i) for i in items]
+
+    return _cached("*", load)
+
+
+def save_group(group_id: str, name: str, players: list, games: list = None, colors: dict = None):
+    """Create or update a group in the registry."""
+    if not re.fullmatch(r"[a-z0-9_-]+", group_id or ""):
+        raise ValueError(f"Invalid group id '{group_id}', use lowercase letters, digits, '-' or '_'")
+    if not players:
+        raise ValueError("A group needs at least one player")
+
+    item = {"group_id": group_id, "name": name, "players": list(players)}
+    if games:
+        item["games"] = list(games)
+    if colors:
+        item["colors"] = dict(colors)
+
+    table = aws.get_ddb_table(_get_cfg(), GROUPS_TABLE)
+    table.put_item(Item=item)
+    invalidate()
+    return _with_defaults(item)
+
+
+def validate_player(group_id: str, user_id: str):
+    """Raise ValueError unless `user_id` belongs to the group."""
+    players = get_group(group_id)["players"]
+    if user_id not in players:
+        raise ValueError(f"Invalid user '{user_id}', must be one of {players}")
@@ -0,0 +1,231 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from constants import DEFAULT_GROUP_ID, SCORE_UNITS
+from utils import aws, groups
+
+VERSION_ATTR = "schema_version"
+CHECKPOINT_DIR = ".migrations"
+
+# Ordered list of {"version", "name", "tables", "apply"}
+MIGRATIONS = []
+
+
+def migration(version: int, tables: tuple):
+    """Register `fn(item) -> item` as the migration to schema `version` for `tables`."""
+    def register(fn):
+        MIGRATIONS.append({"version": version, "name": fn.__name__, "tables": tables, "apply": fn})
+        MIGRATIONS.sort(key=lambda m: m["version"])
+        return fn
+    return register
+
+
+def iso_date(value: str):
+    """'DD-MM-YYYY' (legacy) or 'YYYY-MM-DD' -> 'YYYY-MM-DD'. Other values are returned unchanged."""
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except (TypeError, ValueError):
+            continue
+    return value
+
+
+@migration(1, ("game_scores",))
+def iso_game_date(item: dict):
+    """Store game_date as sortable ISO 'YYYY-MM-DD' so date filters can be pushed down."""
+    if "game_date" in item:
+        item["game_date"] = iso_date(item["game_date"])
+    return item
+
+
+@migration(2, ("game_scores", "raw_game_posts"))
+def fill_missing_fields(item: dict):
+    """Give rows written by older versions a group and units (key attributes are never changed)."""
+    if "group_id" not in item and "#" in item.get("pk", ""):
+        item["group_id"] = item["pk"].split("#", 1)[0]
+    item.setdefault("group_id", DEFAULT_GROUP_ID)
+    if "scores" in item and not item.get("units"):
+        item["units"] = SCORE_UNITS.get(item.get("game_name"), ["points"])[:len(item["scores"])]
+    return item
+
+
+def latest_version(table_name: str):
+    versions = [m["version"] for m in MIGRATIONS if table_name in m["tables"]]
+    return max(versions, default=0)
+
+
+def upgrade(item: dict, table_name: str):
+    """Apply every pending migration to a copy of `item`. Returns None if it is up to date."""
+    current = int(item.get(VERSION_ATTR, 0))
+    pending = [m for m in MIGRATIONS if table_name in m["tables"] and m["version"] > current]
+    if not pending:
+        return None
+    item = dict(item)
+    for m in pending:
+        item = m["apply"](item)
+    item[VERSION_ATTR] = pending[-1]["version"]
+    return item
+
+
+class _Checkpoint:
+    """Per-segment progress (LastEvaluatedKey and counters) persisted as JSON."""
+
+    def __init__(self, path: str, target: int, total_segments: int, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.state = {"target": target, "total_segments": total_segments, "segments": {}}
+        if enabled and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            # Only resume a run for the same target and segmentation
+            if saved.get("target") == target and saved.get("total_segments") == total_segments:
+                self.state = saved
+
+    def segment(self, segment: int):
+        return self.state["segments"].setdefault(
+            str(segment), {"last_key": None, "done": False, "scanned": 0, "changed": 0}
+        )
+
+    def save(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.state, f, default=str)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Forget a finished run, so the next one scans the table again."""
+        if self.enabled and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _scan_segments(open_tables, segments: int, page_size: int, checkpoint: _Checkpoint,
+                   handle_page, progress=None):
+    """
+    Scan the first of `open_tables()` (called once per thread) in `segments`
+    parallel segments, passing each page to `handle_page(tables, items)`,
+    which returns how many items it changed. Every segment's position is
+    checkpointed after each page, and the checkpoint is cleared once every
+    segment is done.
+    """
+    def run_segment(segment: int):
+        state = checkpoint.segment(segment)
+        if state["done"]:
+            return
+        tables = open_tables()  # one resource per thread
+        while True:
+            kwargs = {"Segment": segment, "TotalSegments": segments, "Limit": page_size}
+            if state["last_key"]:
+                kwargs["ExclusiveStartKey"] = state["last_key"]
+            response = tables[0].scan(**kwargs)
+
+            items = response.get("Items", [])
+            state["scanned"] += len(items)
+            state["changed"] += handle_page(tables, items)
+            state["last_key"] = response.get("LastEvaluatedKey")
+            state["done"] = not state["last_key"]
+            checkpoint.save()
+            if progress:
+                progress(segment, state["scanned"], state["changed"])
+            if state["done"]:
+                return
+
+    with ThreadPoolExecutor(max_workers=segments) as pool:
+        # list() re-raises the first segment error
+        list(pool.map(run_segment, range(segments)))
+
+    seg_states = checkpoint.state["segments"].values()
+    checkpoint.clear()
+    return sum(s["scanned"] for s in seg_states), sum(s["changed"] for s in seg_states)
+
+
+def migrate(AWS_CFG, table_name: str, dry_run: bool = False, segments: int = 4,
+            page_size: int = 500, checkpoint_path: str = None, progress=None):
+    """
+    Upgrade every item of `table_name` to the latest schema version.
+
+    The table is read with `segments` parallel segmented scans; changed
+    items of each page are rewritten with a batch writer. After every page
+    the segment's LastEvaluatedKey is checkpointed, so an interrupted run
+    resumes where it stopped. With `dry_run` nothing is written (neither
+    items nor checkpoints) and only the counts are reported.
+
+    `progress(segment, scanned, changed)` is called after each page.
+    Returns {"scanned": n, "changed": n, "target_version": v}.
+    """
+    target = latest_version(table_name)
+    checkpoint = _Checkpoint(
+        checkpoint_path or os.path.join(CHECKPOINT_DIR, f"{table_name}.json"),
+        target, segments, enabled=not dry_run,
+    )
+
+    def upgrade_page(tables, items):
+        upgraded = [u for u in (upgrade(i, table_name) for i in items) if u]
+        if upgraded and not dry_run:
+            aws.put_items(tables[0], upgraded)
+        return len(upgraded)
+
+    scanned, changed = _scan_segments(
+        lambda: (aws.get_ddb_table(AWS_CFG, table_name),),
+        segments, page_size, checkpoint, upgrade_page, progress,
+    )
+    return {"scanned": scanned, "changed": changed, "target_version": target}
+
+
+def rekey_item(item: dict, table_name: str):
+    """A copy of an item from a table keyed by user_id, upgraded and given its `pk`."""
+    item = upgrade(item, table_name) or dict(item)
+    item["pk"] = groups.partition_key(item["group_id"], item["user_id"])
+    return item
+
+
+def create_table(AWS_CFG, name: str):
+    """Create an on-demand table keyed by (pk, timestamp) with a NEW_AND_OLD_IMAGES stream and wait for it."""
+    client = aws.get_client(AWS_CFG, "dynamodb")
+    client.create_table(
+        TableName=name,
+        KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"},
+                   {"AttributeName": "timestamp", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"},
+                              {"AttributeName": "timestamp", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+        StreamSpecification={"StreamEnabled": True, "StreamViewType": "NEW_AND_OLD_IMAGES"},
+    )
+    client.get_waiter("table_exists").wait(TableName=name)
+
+
+def rekey(AWS_CFG, table_name: str, source: str, target: str, dry_run: bool = False,
+          segments: int = 4, page_size: int = 500, checkpoint_path: str = None, progress=None):
+    """
+    Copy every item of `source`, a table created before groups and keyed by
+    (user_id, timestamp), into `target`, keyed by (pk, timestamp). Items are
+    upgraded to the latest schema version on the way, which also fills
+    `group_id`. Like `migrate`, the copy runs as parallel segmented scans and
+    resumes from its checkpoint; `source` is only read.
+
+    Once it is done, point the app at the copy with `[tables]` in secrets.
+    Returns {"scanned": n, "copied": n}.
+    """
+    checkpoint = _Checkpoint(
+        checkpoint_path or os.path.join(CHECKPOINT_DIR, f"{table_name}.rekey.{target}.json"),
+        f"rekey:{source}:{target}", segments, enabled=not dry_run,
+    )
+
+    def copy_page(tables, items):
+        copied = [rekey_item(i, table_name) for i in items]
+        if copied and not dry_run:
+            aws.put_items(tables[1], copied)
+        return len(copied)
+
+    scanned, copied = _scan_segments(
+        lambda: (aws.get_ddb_table(AWS_CFG, table_name, physical=source),
+                 aws.get_ddb_table(AWS_CFG, table_name, physical=target)),
+        segments, page_size, checkpoint, copy_page, progress,
+    )
+    return {"scanned": scanned, "copied": copied}
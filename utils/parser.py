@@ -1,4 +1,41 @@
+import copy
+import hashlib
 import re
+from utils.lru import LRUCache
+
+# Shared by all sessions: Streamlit reruns re-parse the same post many times
+_parse_cache = LRUCache(maxsize=512)
+
+
+def _cache_key(text: str):
+    normalized = text.replace("\r\n", "\n").strip()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def parse_post_cached(text: str):
+    """
+    parse_post with a bounded LRU cache keyed by a hash of the normalized text.
+    Failed parses are cached too and raise the same ValueError.
+    """
+    key = _cache_key(text)
+    cached = _parse_cache.get(key)
+    if cached is None:
+        try:
+            cached = ("ok", parse_post(text))
+        except ValueError as e:
+            cached = ("error", str(e))
+        _parse_cache.put(key, cached)
+
+    status, value = cached
+    if status == "error":
+        raise ValueError(value)
+    return copy.deepcopy(value)
+
+
+def parse_cache_info():
+    """Hit/miss counters and size of the parse cache."""
+    return _parse_cache.info()
+
 
 def parse_post(text: str):
     text = text.strip()
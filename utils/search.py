@@ -0,0 +1,183 @@
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from utils import parser
+
+INDEX_DIR = ".search"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# How many vocabulary terms a trailing prefix may expand to
+MAX_PREFIX_TERMS = 50
+
+# Changes are written to disk at most this often (see SearchIndex.save_soon)
+SAVE_DELAY_SECONDS = 5.0
+
+
+def tokenize(text: str):
+    """Lowercase words and numbers with diacritics folded, so 'Mikuś' matches 'mikus'."""
+    folded = unicodedata.normalize("NFKD", (text or "").casefold())
+    folded = "".join(c for c in folded if not unicodedata.combining(c)).replace("ł", "l")
+    return re.findall(r"\w+", folded)
+
+
+def post_terms(item: dict):
+    """Terms of a post: its text plus the parsed game name and number and the player."""
+    terms = tokenize(item.get("raw_post"))
+    try:
+        parsed = parser.parse_post_cached(item.get("raw_post") or "")
+        terms += tokenize(parsed["game_name"]) + tokenize(str(parsed["game_number"]))
+    except ValueError:
+        pass  # not a game post; its text is still searchable
+    return terms + tokenize(item.get("user_id"))
+
+
+def _doc_id(key: tuple):
+    return "\t".join(key)
+
+
+def _key(doc_id: str):
+    return tuple(doc_id.split("\t"))
+
+
+class SearchIndex:
+    """
+    Inverted index over posts (term -> {post: term frequency}) ranked with
+    BM25. Posts are keyed by (pk, timestamp); adding a post again replaces
+    it. A forward index (post -> its terms) keeps replacing and removing a
+    post proportional to its own terms. The newest indexed timestamp is kept
+    as a watermark, so a loaded index can catch up with a delta query.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.watermark = None
+        self._postings = {}  # term -> {doc_id: tf}
+        self._lengths = {}  # doc_id -> number of terms
+        self._doc_terms = {}  # doc_id -> its distinct terms
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def __contains__(self, key: tuple):
+        return _doc_id(key) in self._lengths
+
+    def add(self, item: dict):
+        key = (item.get("pk"), item.get("timestamp"))
+        if None in key:
+            return
+        terms = post_terms(item)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        doc_id = _doc_id(key)
+        with self._lock:
+            self._remove(doc_id)
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+            self._doc_terms[doc_id] = list(counts)
+            self._lengths[doc_id] = len(terms)
+            if self.watermark is None or key[1] > self.watermark:
+                self.watermark = key[1]
+
+    def remove(self, key: tuple):
+        with self._lock:
+            self._remove(_doc_id(key))
+
+    def _remove(self, doc_id: str):
+        if self._lengths.pop(doc_id, None) is None:
+            return
+        for term in self._doc_terms.pop(doc_id, ()):
+            docs = self._postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self._postings[term]
+
+    def search(self, query: str, limit: int = 50):
+        """
+        Keys of the posts matching every query word, best first, as
+        [(key, score)]. The last word also matches as a prefix.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            if not self._lengths:
+                return []
+            groups = [[w] for w in words[:-1]]
+            last = words[-1]
+            groups.append([last] + [t for t in self._postings if t.startswith(last) and t != last][:MAX_PREFIX_TERMS])
+
+            avg_length = sum(self._lengths.values()) / len(self._lengths)
+            scores = None
+            for terms in groups:
+                matched = {}
+                for term in terms:
+                    docs = self._postings.get(term, {})
+                    idf = math.log(1 + (len(self._lengths) - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for doc_id, tf in docs.items():
+                        norm = tf + K1 * (1 - B + B * self._lengths[doc_id] / avg_length)
+                        matched[doc_id] = matched.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+                if scores is None:
+                    scores = matched
+                else:
+                    scores = {d: s + matched[d] for d, s in scores.items() if d in matched}
+                if not scores:
+                    return []
+
+        # Ties go to the newer post
+        ranked = sorted(scores.items(), key=lambda kv: (kv[1], _key(kv[0])[1]), reverse=True)
+        return [(_key(doc_id), score) for doc_id, score in ranked[:limit]]
+
+    def save(self):
+        """Write the index to its path as JSON (atomically)."""
+        if not self.path:
+            return
+        with self._lock:
+            state = {"watermark": self.watermark, "lengths": self._lengths, "postings": self._postings}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def save_soon(self):
+        """
+        Save from a background thread within SAVE_DELAY_SECONDS, so a burst
+        of changes is written once instead of rewriting the file per change.
+        """
+        with self._lock:
+            if self._timer is not None or not self.path:
+                return
+            self._timer = threading.Timer(SAVE_DELAY_SECONDS, self._save_pending)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_pending(self):
+        with self._lock:
+            self._timer = None
+        self.save()
+
+    @classmethod
+    def load(cls, path: str):
+        """Index saved at `path`, or an empty one if there is none or it is unreadable."""
+        index = cls(path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return index
+        index.watermark = state.get("watermark")
+        index._lengths = state.get("lengths", {})
+        index._postings = state.get("postings", {})
+        for term, docs in index._postings.items():
+            for doc_id in docs:
+                index._doc_terms.setdefault(doc_id, []).append(term)
+        return index
@@ -0,0 +1,86 @@
+import glob
+import os
+import time
+from decimal import Decimal
+
+SUFFIX = ".arrow"
+
+
+def _plain(value):
+    """Convert DynamoDB Decimals (also nested in lists/dicts) to int/float."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def to_arrow(items: list):
+    """Build an Arrow table from items that may not all share the same attributes."""
+    import pyarrow as pa
+
+    columns = sorted({key for item in items for key in item})
+    return pa.table({c: [_plain(item.get(c)) for item in items] for c in columns})
+
+
+def from_arrow(table):
+    """Turn an Arrow table back into items, dropping attributes an item did not have."""
+    return [
+        {k: v for k, v in row.items() if v is not None}
+        for row in table.to_pylist()
+    ]
+
+
+def _paths(directory: str, name: str):
+    return sorted(glob.glob(os.path.join(directory, f"{name}-*{SUFFIX}")))
+
+
+def write_snapshot(directory: str, name: str, items: list, watermark: str = None, keep: int = 2):
+    """
+    Write items to `<directory>/<name>-<ms>.arrow` as an Arrow IPC file.
+    The newest item timestamp is stored as `watermark` in the schema metadata.
+    Only the `keep` most recent snapshots are kept.
+    """
+    import pyarrow as pa
+
+    os.makedirs(directory, exist_ok=True)
+    table = to_arrow(items)
+    table = table.replace_schema_metadata({"watermark": watermark or ""})
+
+    path = os.path.join(directory, f"{name}-{int(time.time() * 1000)}{SUFFIX}")
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    for old in _paths(directory, name)[:-keep]:
+        os.remove(old)
+    return path
+
+
+def remove(directory: str, name: str):
+    """Delete every snapshot for `name`, e.g. after items left the hot table."""
+    for path in _paths(directory, name):
+        os.remove(path)
+
+
+def load_latest(directory: str, name: str):
+    """
+    Memory-map the newest snapshot for `name`.
+    Returns (items, watermark) or (None, None) if there is no readable snapshot.
+    """
+    import pyarrow as pa
+
+    for path in reversed(_paths(directory, name)):
+        try:
+            with pa.memory_map(path, "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+        except (OSError, pa.ArrowInvalid):
+            continue  # partially written or corrupt – try an older one
+        metadata = table.schema.metadata or {}
+        watermark = metadata.get(b"watermark", b"").decode() or None
+        return from_arrow(table), watermark
+    return None, None
@@ -0,0 +1,172 @@
+import threading
+import numpy as np
+import pandas as pd
+from constants import SCORE_UNITS
+from utils import data
+
+SERIES = ["user_id", "game_name", "metric"]
+STAT_COLUMNS = ["mean", "median", "p25", "p75", "best"]
+
+DEFAULT_WINDOW_DAYS = 7
+
+# Units where a smaller number is a better result
+LOWER_IS_BETTER = {"seconds", "guesses", "backtracks"}
+
+
+def _item_key(item: dict):
+    return (item.get("pk"), item.get("timestamp"))
+
+
+def _fingerprint(item: dict):
+    """What the stats of a score item depend on, to spot rewrites of the same key."""
+    scores = item.get("scores")
+    return (tuple(scores) if isinstance(scores, list) else scores, item.get("game_date"))
+
+
+def parse_game_dates(dates: pd.Series):
+    """Parse ISO game dates, falling back to 'DD-MM-YYYY' for rows not migrated yet."""
+    parsed = pd.to_datetime(dates, format="%Y-%m-%d", errors="coerce")
+    return parsed.fillna(pd.to_datetime(dates, format="%d-%m-%Y", errors="coerce"))
+
+
+def scores_frame(items: list):
+    """
+    Long frame with one row per (score item, metric):
+    key, user_id, game_name, metric, game_date, timestamp, value.
+    """
+    columns = ["key", "user_id", "game_name", "metric", "game_date", "timestamp", "value"]
+    if not items:
+        return pd.DataFrame(columns=columns)
+
+    df = pd.DataFrame({
+        "key": [_item_key(i) for i in items],
+        "user_id": [i.get("user_id") for i in items],
+        "game_name": [i.get("game_name") for i in items],
+        "game_date": [i.get("game_date") for i in items],
+        "timestamp": [i.get("timestamp") for i in items],
+        "value": [i.get("scores") if isinstance(i.get("scores"), list) else [] for i in items],
+    })
+    df["idx"] = df["value"].apply(lambda s: list(range(len(s))))
+    df = df.explode(["value", "idx"]).dropna(subset=["value"])
+
+    units = df.apply(lambda r: SCORE_UNITS.get(r["game_name"], []), axis=1)
+    df["metric"] = [u[i] if i < len(u) else "Score" for u, i in zip(units, df["idx"])]
+    df["value"] = pd.to_numeric(df["value"], errors="coerce").astype(float)
+    df["game_date"] = parse_game_dates(df["game_date"])
+    df = df.dropna(subset=["value", "game_date"])
+    return df[columns].reset_index(drop=True)
+
+
+def compute(frame: pd.DataFrame, window_days: int = DEFAULT_WINDOW_DAYS, prior_best: pd.Series = None):
+    """
+    Add rolling stats over the last `window_days` days of each series
+    (player, game, metric) plus the running personal best.
+
+    `prior_best` (indexed by SERIES) seeds the personal best, so a tail of
+    a series can be computed on its own.
+    """
+    frame = frame.sort_values(SERIES + ["game_date", "timestamp"], kind="stable").reset_index(drop=True)
+    if frame.empty:
+        return frame.assign(**{c: pd.Series(dtype=float) for c in STAT_COLUMNS})
+
+    rolling = frame.groupby(SERIES, sort=False, dropna=False).rolling(f"{window_days}D", on="game_date", min_periods=1)["value"]
+
+    def aligned(result):
+        # frame is sorted by series, so groups come back in frame order
+        return result.to_numpy()
+
+    frame["mean"] = aligned(rolling.mean())
+    frame["median"] = aligned(rolling.median())
+    frame["p25"] = aligned(rolling.quantile(0.25))
+    frame["p75"] = aligned(rolling.quantile(0.75))
+
+    lower = frame["metric"].isin(LOWER_IS_BETTER).to_numpy()
+    grouped = frame.groupby(SERIES, sort=False, dropna=False)["value"]
+    best = np.where(lower, grouped.cummin(), grouped.cummax())
+    if prior_best is not None and not prior_best.empty:
+        seed = frame[SERIES].merge(
+            prior_best.rename("seed").reset_index(), on=SERIES, how="left"
+        )["seed"].to_numpy()
+        has_seed = ~np.isnan(seed)
+        best = np.where(has_seed & lower, np.fmin(best, seed), best)
+        best = np.where(has_seed & ~lower, np.fmax(best, seed), best)
+    frame["best"] = best
+    return frame
+
+
+class StatsEngine:
+    """
+    Caches per-group stats frames against a data version.
+    When new score items appear only the affected tail of each touched
+    series is recomputed instead of the full history; removed or rewritten
+    items start over.
+    """
+
+    def __init__(self, window_days: int = DEFAULT_WINDOW_DAYS):
+        self.window_days = window_days
+        self._state = {}  # group_id -> {"version", "keys": {key: fingerprint}, "frame"}
+        self._lock = threading.Lock()
+
+    def get(self, group_id: str, items: list, version):
+        with self._lock:
+            state = self._state.get(group_id)
+            if state is not None and state["version"] == version:
+                return state["frame"]
+
+            keys = {_item_key(i): _fingerprint(i) for i in items}
+            if state is None or any(keys.get(k) != fp for k, fp in state["keys"].items()):
+                # first use, or items were removed or rewritten – start over
+                frame = compute(scores_frame(items), self.window_days)
+            else:
+                new_items = [i for i in items if _item_key(i) not in state["keys"]]
+                frame = self._update(state["frame"], scores_frame(new_items))
+
+            self._state[group_id] = {"version": version, "keys": keys, "frame": frame}
+            return frame
+
+    def _update(self, frame: pd.DataFrame, new_rows: pd.DataFrame):
+        if new_rows.empty:
+            return frame
+
+        # Earliest new date per touched series: rows from there on are recomputed
+        starts = new_rows.groupby(SERIES)["game_date"].min().rename("start").reset_index()
+        merged = frame.merge(starts, on=SERIES, how="left")
+        touched = merged["start"].notna().to_numpy()
+        start = merged["start"].to_numpy()
+        date = merged["game_date"].to_numpy()
+
+        is_tail = touched & (date >= start)
+        window = np.timedelta64(self.window_days, "D")
+        is_context = touched & ~is_tail & (date > start - window)
+
+        head = frame[~is_tail]
+        prior_best = frame[touched & ~is_tail].groupby(SERIES)["best"].last()
+
+        context = frame[is_context][new_rows.columns].assign(_context=True)
+        tail = pd.concat(
+            [frame[is_tail][new_rows.columns], new_rows], ignore_index=True
+        ).assign(_context=False)
+
+        recomputed = compute(pd.concat([context, tail], ignore_index=True), self.window_days, prior_best)
+        recomputed = recomputed[~recomputed["_context"]].drop(columns="_context")
+
+        combined = pd.concat([head, recomputed], ignore_index=True)
+        return combined.sort_values(SERIES + ["game_date", "timestamp"], kind="stable").reset_index(drop=True)
+
+
+def latest(frame: pd.DataFrame):
+    """Most recent stats row of every series."""
+    if frame.empty:
+        return frame
+    return frame.groupby(SERIES, sort=False).tail(1).reset_index(drop=True)
+
+
+_engine = StatsEngine()
+
+
+def group_stats(group_id: str):
+    """Stats frame for a group's scores, reusing cached results while the data is unchanged."""
+    # Read the version first: a change landing in between then only costs a recompute
+    version = data.data_version("game_scores", group_id)
+    items = data.load_history("game_scores", group_id)
+    return _engine.get(group_id, items, version)
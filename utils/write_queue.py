@@ -0,0 +1,230 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+from utils import aws
+
+THROTTLE_CODES = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+
+
+def write_key(table_name: str, item: dict):
+    """Return the id of a queued write, derived from the item's primary key."""
+    return f"{table_name}/{item.get('pk')}/{item.get('timestamp')}"
+
+
+def is_throttled(error: Exception):
+    """True if a DynamoDB error means the request was throttled."""
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in THROTTLE_CODES
+
+
+class WriteQueue:
+    """
+    Bounded write-behind queue for DynamoDB puts.
+
+    Writes are journaled to a local JSONL file before they are queued, so
+    anything not yet written survives a restart and is replayed on start.
+    Worker threads drain up to `batch_size` writes at a time and retry
+    throttled batches with jittered exponential backoff. Writes that fail
+    for other reasons are kept aside and can be re-queued with
+    `retry_failed()` without restarting. `on_written(table_name, item)` is
+    called from a worker thread for every write that reaches the table.
+    """
+
+    def __init__(self, AWS_CFG, journal_path: str, maxsize: int = 500, workers: int = 2,
+                 batch_size: int = 25, max_retries: int = 8, base_delay: float = 0.1,
+                 max_delay: float = 10.0, on_written=None):
+        self.AWS_CFG = AWS_CFG
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.on_written = on_written
+
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._status = {}  # write id -> status, until the write is written
+        self._failed = {}  # write id -> (entry, error message)
+        self._local = threading.local()  # per worker thread: table name -> table
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+        pending = self._load_journal()
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"write-queue-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+        for entry in pending:
+            self._status[entry["id"]] = "queued"
+            self._queue.put(entry)
+
+    # ---- public API ----
+
+    def submit(self, table_name: str, item: dict, timeout: float = 0.05):
+        """
+        Journal and enqueue a put. Returns the write id.
+        Raises queue.Full if the queue stays full for `timeout` seconds.
+        """
+        entry = {"op": "put", "id": write_key(table_name, item), "table": table_name, "item": item}
+        with self._lock:
+            self._journal(entry)
+            self._status[entry["id"]] = "queued"
+        try:
+            self._queue.put(entry, timeout=timeout)
+        except queue.Full:
+            self._finish([entry], None)
+            raise
+        return entry["id"]
+
+    def status(self, write_id: str):
+        """Return 'queued', 'retrying', 'failed' or None once written (or if unknown)."""
+        return self._status.get(write_id)
+
+    def error(self, write_id: str):
+        """Error message of a failed write, or None."""
+        failed = self._failed.get(write_id)
+        return failed[1] if failed else None
+
+    def retry_failed(self):
+        """Re-queue every failed write. Returns how many were re-queued."""
+        with self._lock:
+            entries = [entry for entry, _ in self._failed.values()]
+            self._failed.clear()
+            for entry in entries:
+                self._status[entry["id"]] = "queued"
+        for entry in entries:
+            self._queue.put(entry)
+        return len(entries)
+
+    def pending(self):
+        """Number of writes not yet handled by a worker."""
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until every queued write has been handled."""
+        self._queue.join()
+
+    def stop(self):
+        """Stop workers after their current batch; pending writes stay journaled."""
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=1)
+
+    # ---- workers ----
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_table = {}
+            for entry in batch:
+                by_table.setdefault(entry["table"], []).append(entry)
+            for table_name, entries in by_table.items():
+                self._write_batch(table_name, entries)
+
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, table_name: str, entries: list):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._put_all(table_name, [e["item"] for e in entries])
+                self._finish(entries, "written")
+                if self.on_written:
+                    for e in entries:
+                        self.on_written(table_name, e["item"])
+                return
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    # Left in the journal, so the write is also retried on next start
+                    self._finish(entries, "failed", journal=False)
+                    with self._lock:
+                        for entry in entries:
+                            self._failed[entry["id"]] = (entry, str(e))
+                    return
+                self._set_status(entries, "retrying")
+                time.sleep(self._backoff(attempt))
+
+    def _put_all(self, table_name: str, items: list):
+        aws.put_items(self._get_table(table_name), items)
+
+    def _get_table(self, table_name: str):
+        """This worker thread's table (boto3 resources are not shared across threads)."""
+        if not hasattr(self._local, "tables"):
+            self._local.tables = {}
+        tables = self._local.tables
+        if tables.get(table_name) is None:
+            tables[table_name] = aws.get_ddb_table(self.AWS_CFG, table_name)
+            if tables[table_name] is None:
+                raise RuntimeError(f"Table '{table_name}' is not accessible")
+        return tables[table_name]
+
+    def _backoff(self, attempt: int):
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _set_status(self, entries: list, status: str):
+        with self._lock:
+            for e in entries:
+                self._status[e["id"]] = status
+
+    def _finish(self, entries: list, status: str, journal: bool = True):
+        with self._lock:
+            for e in entries:
+                if status in ("written", None):
+                    self._status.pop(e["id"], None)  # nothing left to report
+                else:
+                    self._status[e["id"]] = status
+                if journal:
+                    self._journal({"op": "done", "id": e["id"]})
+
+    # ---- journal ----
+
+    def _journal(self, record: dict):
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    def _load_journal(self):
+        """Return journaled puts without a matching 'done' and compact the file."""
+        if not os.path.exists(self.journal_path):
+            return []
+
+        pending = {}
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn write at crash time
+                if record.get("op") == "put":
+                    pending[record["id"]] = record
+                elif record.get("op") == "done":
+                    pending.pop(record["id"], None)
+
+        entries = list(pending.values())
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, default=str) + "\n")
+        os.replace(tmp_path, self.journal_path)
+        return entries